@@ -0,0 +1,282 @@
+"""
+Headless batch import of terrain
+
+Usage:
+    blender --background --python batch_import.py -- jobs.json [--processes N]
+    python batch_import.py jobs.json [--processes N]
+
+The second form doesn't need Blender, it handles only the jobs with a .npz output.
+
+The jobs are decoded and projected in parallel in a pool of worker processes. Each job writes its mesh
+to its own file: a .blend file with a scene holding the terrain object or a .npz file with the arrays
+verts, indices, filled, the height statistics (see raster_ops.heightStatsNames) and latitude, longitude
+of the origin of the projection (projectedX, projectedY for a raster with projected coordinates).
+
+The job file is a JSON file:
+{
+    "processes": 8,
+    "defaults": {"primitiveType": "triangle", "fillVoids": true},
+    "jobs": [
+        {
+            "name": "spa",
+            "source": "srtm",
+            "srtmDir": "tiles",
+            "tileDirs": ["/data/srtm1", "/data/srtm3"],
+            "extent": [50.40, 50.46, 5.93, 5.99],
+            "origin": [50.43, 5.96],
+            "stride": 2,
+            "output": "out/spa.blend"
+        },
+        {
+            "name": "bathurst",
+            "source": "grid",
+            "file": "bathurst.grid",
+            "output": "out/bathurst.npz"
+        }
+    ]
+}
+"extent" is [min lat, max lat, min lon, max lon]. "origin" is [lat, lon] of the origin of the projection,
+the center of the extent is used by default. The "file" of a grid job is a .grid file, an ESRI ASCII grid (.asc)
+or a raw .flt or .bil raster, see pt_array.openGrid(..); "origin" is [y, x] in meters for a raster
+with projected coordinates. "resolution" of an SRTM job is the number of the intervals between the posts
+of a tile row, 3600 (SRTM1) or 1200 (SRTM3), the tiles of the other resolution are resampled to it;
+the resolution of the finest tile of the extent is used by default, see Srtm.size.
+The keys of "defaults" are used for each job that doesn't set them.
+The relative paths are relative to the directory of the job file.
+The other keys of a job are passed to the importer engine, see engineParams; the keys of sourceParams
+are supported only by the jobs of that source.
+"""
+
+import sys, os, json, time, argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+try:
+        import bpy
+except ImportError:
+        # running outside of Blender, only the .npz outputs are possible
+        bpy = None
+
+from transverse_mercator import TransverseMercator, PlanarProjection
+from srtm import Srtm
+from pt_array import PtArray, openGrid
+from tile_index import TileIndex
+from raster_ops import heightStatsNames
+
+# the keys of a job passed to Srtm or PtArray and their default values
+engineParams = {
+        "primitiveType": "quad",
+        "maxError": 1,
+        "stride": 1,
+        "vertexBudget": 0,
+        "decimationMethod": "sample",
+        "fillVoids": False,
+        "voidSubstitution": 0,
+        "resampleSpacing": 0,
+        "resampleMethod": "bilinear"
+}
+
+# the keys of engineParams supported only by the jobs of one source
+sourceParams = {
+        "srtm": ("voidSubstitution",),
+        "grid": ("resampleSpacing", "resampleMethod")
+}
+
+# the keys of a job holding paths
+pathKeys = ("srtmDir", "tileDirs", "file", "output")
+
+
+def loadJobs(filepath):
+        """
+        Returns the tuple (jobs, processes) for the job file
+        Each job gets the defaults of the job file and the absolute paths
+        """
+        with open(filepath) as f:
+                jobFile = json.load(f)
+        baseDir = os.path.dirname(os.path.abspath(filepath))
+        jobs = []
+        for (i, _job) in enumerate(jobFile["jobs"]):
+                job = dict(jobFile.get("defaults", {}))
+                job.update(_job)
+                for key in pathKeys:
+                        if key in job:
+                                job[key] = [os.path.join(baseDir, path) for path in job[key]] if isinstance(job[key], list) \
+                                        else os.path.join(baseDir, job[key])
+                if "output" not in job:
+                        raise ValueError("The job %s doesn't have an output" % i)
+                job.setdefault("name", os.path.splitext(os.path.basename(job["output"]))[0])
+                jobs.append(job)
+        return (jobs, jobFile.get("processes"))
+
+
+def buildJob(job):
+        """
+        Decodes and projects the terrain of the job
+        Returns the dictionary of the arrays described in the module docstring
+        """
+        source = job.get("source", "srtm")
+        params = getParams(job, source)
+        if source == "srtm":
+                (minLat, maxLat, minLon, maxLon) = job["extent"]
+                origin = job.get("origin") or ((minLat+maxLat)/2, (minLon+maxLon)/2)
+                projection = TransverseMercator(lat=origin[0], lon=origin[1])
+                srtm = Srtm(
+                        minLat=minLat,
+                        maxLat=maxLat,
+                        minLon=minLon,
+                        maxLon=maxLon,
+                        projection=projection,
+                        srtmDir=job.get("srtmDir", "."),
+                        tileIndex=TileIndex(job["tileDirs"]) if job.get("tileDirs") else None,
+                        size=job.get("resolution"),
+                        **params
+                )
+                missingSrtmFiles = srtm.getMissingSrtmFiles()
+                if missingSrtmFiles:
+                        raise ValueError("SRTM files are missing: %s" % ", ".join(missingSrtmFiles))
+                srtm.detectSize()
+                (verts, indices, filled, stats) = srtm.build()
+        elif source == "grid":
+                (f, (nx, ny, incx, incy, minlon, minlat), layout) = openGrid(job["file"])
+                with f:
+                        origin = job.get("origin") or (minlat + incy*ny/2, minlon + incx*nx/2)
+                        projection = TransverseMercator(lat=origin[0], lon=origin[1]) if layout.get("geographic", True) \
+                                else PlanarProjection(x=origin[1], y=origin[0])
+                        (verts, indices, stats) = PtArray(
+                                nx=nx, ny=ny, incx=incx, incy=incy, minlon=minlon, minlat=minlat,
+                                projection=projection, f=f, layout=layout, **params
+                        ).build()
+                filled = np.zeros(0, dtype=np.int32)
+        arrays = dict(verts=verts, indices=indices, filled=filled)
+        if isinstance(projection, PlanarProjection):
+                arrays.update(projectedX=np.float64(projection.x), projectedY=np.float64(projection.y))
+        else:
+                arrays.update(latitude=np.float64(projection.lat), longitude=np.float64(projection.lon))
+        arrays.update(stats)
+        return arrays
+
+
+def validateJob(job):
+        """
+        Checks the job before it is run
+        Raises ValueError for the invalid keys of the job (see getParams(..))
+        or for a .blend output outside of Blender
+        """
+        getParams(job, job.get("source", "srtm"))
+        if not bpy and not job["output"].lower().endswith(".npz"):
+                raise ValueError("The .blend output needs Blender, run the job with blender --background --python")
+
+
+def getParams(job, source):
+        """
+        Returns the dictionary of the keys of engineParams passed to the engine of the job of the source
+        Raises ValueError for an unknown source or if the job sets a key of another source
+        to a value other than the default one
+        """
+        if source not in sourceParams:
+                raise ValueError("Unknown source %s" % source)
+        params = {}
+        for key in engineParams:
+                value = job.get(key, engineParams[key])
+                if any(key in keys for (_source, keys) in sourceParams.items() if _source != source):
+                        if value != engineParams[key]:
+                                raise ValueError("The key %s isn't supported by the %s jobs" % (key, source))
+                        continue
+                params[key] = value
+        return params
+
+
+def runJob(job):
+        """
+        Runs in a worker process
+        Writes the .npz output of the job and returns None or returns the arrays for a .blend output
+        """
+        arrays = buildJob(job)
+        output = job["output"]
+        if output.lower().endswith(".npz"):
+                makeDirs(output)
+                np.savez(output, **arrays)
+                return None
+        return arrays
+
+
+def writeBlend(job, arrays):
+        """
+        Writes a .blend file with a scene holding the terrain object of the job
+        """
+        from mesh_builder import createMesh, addVertexGroup, setCustomProperties
+        name = job["name"]
+        mesh = createMesh(name, arrays["verts"], arrays["indices"])
+        obj = bpy.data.objects.new(name, mesh)
+        addVertexGroup(obj, "void_filled", arrays["filled"])
+        setCustomProperties(obj, dict((key, arrays[key]) for key in heightStatsNames))
+        scene = bpy.data.scenes.new(name)
+        scene.objects.link(obj)
+        # the georeferencing like the importers set it
+        for key in ("latitude", "longitude", "projectedX", "projectedY"):
+                if key in arrays:
+                        scene[key] = float(arrays[key])
+        makeDirs(job["output"])
+        # the scene is written with the datablocks it uses
+        bpy.data.libraries.write(job["output"], {scene})
+        bpy.data.scenes.remove(scene)
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+def makeDirs(filepath):
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+
+
+def main(args):
+        """
+        Runs the jobs of the job file, returns the number of the failed jobs
+        """
+        parser = argparse.ArgumentParser(description="Batch import of terrain")
+        parser.add_argument("jobFile", help="JSON file with the jobs")
+        parser.add_argument("--processes", type=int, help="the number of the worker processes")
+        args = parser.parse_args(args)
+
+        (jobs, processes) = loadJobs(args.jobFile)
+        processes = args.processes or processes or os.cpu_count()
+        if bpy:
+                # the worker processes don't need Blender, they are started with its Python interpreter
+                # where the processes are spawned rather than forked
+                if getattr(bpy.app, "binary_path_python", None):
+                        multiprocessing.set_executable(bpy.app.binary_path_python)
+
+        failures = 0
+        validJobs = []
+        for job in jobs:
+                try:
+                        validateJob(job)
+                except ValueError as e:
+                        failures += 1
+                        print("FAILED %s: %s" % (job["name"], e))
+                        continue
+                validJobs.append(job)
+        startTime = time.time()
+        with ProcessPoolExecutor(max_workers=min(processes, len(validJobs)) or 1) as executor:
+                futures = dict((executor.submit(runJob, job), job) for job in validJobs)
+                for future in as_completed(futures):
+                        job = futures[future]
+                        try:
+                                arrays = future.result()
+                                if arrays is not None:
+                                        writeBlend(job, arrays)
+                        except Exception as e:
+                                failures += 1
+                                print("FAILED %s: %s" % (job["name"], e))
+                                continue
+                        print("%s -> %s (%.1fs)" % (job["name"], job["output"], time.time()-startTime))
+        print("%s of %s jobs done" % (len(jobs)-failures, len(jobs)))
+        return failures
+
+
+if __name__ == "__main__":
+        # Blender passes the arguments of the script after --
+        argv = sys.argv[sys.argv.index("--")+1:] if "--" in sys.argv else sys.argv[1:]
+        sys.exit(1 if main(argv) else 0)
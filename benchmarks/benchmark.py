@@ -0,0 +1,344 @@
+"""
+Benchmarks of the importer engines
+
+Usage:
+    python benchmarks/benchmark.py [--save-baseline] [--scale 0.25] [--repeat 3] [case ...]
+
+The cases are srtm3, srtm1, grid, gridh, grid2, flt and path (see cases), all of them are run by default.
+Blender isn't needed: if bpy can't be imported, the minimal stand-in from benchmarks/standin is used.
+
+The input files are generated by benchmarks/generators.py into --data-dir on the first run.
+Each case is timed stage by stage:
+    read: decoding the tiles or parsing the text files, void filling, height statistics
+    project: the transverse Mercator projection (the shift of the projected coordinates for the flt case)
+    topology: the faces (or the adaptive triangulation) and the removal of unused vertices
+    mesh: mesh_builder.createMesh(..), see benchmarks/standin/bpy.py for what it includes outside of Blender
+The best time of --repeat runs is kept for each stage. The peak memory allocated by Python and NumPy
+is captured by tracemalloc in a separate run, the memory mapped tiles aren't counted.
+
+--save-baseline stores the results in --baseline (benchmarks/baseline.json by default).
+Otherwise the results are compared with the baseline: a stage slower by more than --tolerance
+or the peak memory larger by more than --memory-tolerance is reported as a regression
+and the script exits with the status 1. The baseline is only meaningful on the machine that recorded it.
+"""
+
+import sys, os, time, json, argparse, tempfile, tracemalloc, platform
+from collections import OrderedDict
+
+benchmarkDir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarkDir))
+try:
+        import bpy
+except ImportError:
+        sys.path.append(os.path.join(benchmarkDir, "standin"))
+
+import numpy as np
+
+import srtm, pt_array, hgt_tiles
+from srtm import Srtm
+from pt_array import PtArray, openGrid, convertGrid
+from transverse_mercator import TransverseMercator, PlanarProjection
+from tile_index import getTileName
+from io_import_scene_path import PtPath
+import mesh_builder
+import generators
+
+stages = ("read", "project", "topology", "mesh")
+
+# the stages of the engine functions, the remaining time of the build is counted for the read stage
+stageFunctions = (
+        (TransverseMercator, "fromGeographicArray", "project"),
+        (PlanarProjection, "fromGeographicArray", "project"),
+        (Srtm, "projectRaster", "project"),
+        (srtm, "gridFaces", "topology"),
+        (srtm, "triangulate", "topology"),
+        (srtm, "removeUnusedVertices", "topology"),
+        (pt_array, "gridFaces", "topology"),
+        (pt_array, "triangulate", "topology")
+)
+
+# the size of the cases for --scale 1
+cases = OrderedDict((
+        # 1 degree x 1 degree across 4 SRTM3 tiles, 1201 x 1201 posts
+        ("srtm3", dict(tileSize=1200, extent=1.)),
+        # 0.5 degree x 0.5 degree across 4 SRTM1 tiles, 1801 x 1801 posts
+        ("srtm1", dict(tileSize=3600, extent=0.5)),
+        # 600 x 600 posts
+        ("grid", dict(nx=600, ny=600)),
+        # the same grid in the height-only text format
+        ("gridh", dict()),
+        # the same grid in the binary format
+        ("grid2", dict()),
+        # a LiDAR-like .flt raster with 1 m cells in projected coordinates, 1000 x 1000 posts
+        ("flt", dict(nx=1000, ny=1000)),
+        # 200000 points
+        ("path", dict(numPoints=200000))
+))
+
+# the corner shared by the 4 tiles of the SRTM cases
+originLat = 36
+originLon = -121
+
+# the lower-left corner of the flt case in meters, like UTM coordinates
+originX = 500000.
+originY = 4000000.
+
+
+class StageTimer:
+        """
+        Accumulates the time spent in the wrapped functions by stage
+        The time of a nested wrapped call is counted only for the stage of the nested call
+        """
+
+        def __init__(self):
+                self.times = dict((stage, 0.) for stage in stages)
+                # the time spent in the nested calls for each active call
+                self.stack = []
+                self.patched = []
+
+        def wrap(self, stage, func):
+                def wrapper(*args, **kwargs):
+                        self.stack.append(0.)
+                        start = time.perf_counter()
+                        try:
+                                return func(*args, **kwargs)
+                        finally:
+                                elapsed = time.perf_counter() - start
+                                self.times[stage] += elapsed - self.stack.pop()
+                                if self.stack:
+                                        self.stack[-1] += elapsed
+                return wrapper
+
+        def patch(self):
+                for (owner, name, stage) in stageFunctions:
+                        func = owner.__dict__[name]
+                        self.patched.append((owner, name, func))
+                        setattr(owner, name, self.wrap(stage, func))
+
+        def restore(self):
+                for (owner, name, func) in reversed(self.patched):
+                        setattr(owner, name, func)
+                self.patched = []
+
+
+def prepareData(dataDir, scale, seed):
+        """
+        Generates the input files of the cases unless they are already there
+        Returns the dictionary with the inputs of the cases
+        """
+        dataDir = os.path.join(dataDir, "scale%s_seed%s" % (scale, seed))
+        inputs = {}
+        for name in ("srtm3", "srtm1"):
+                params = cases[name]
+                directory = os.path.join(dataDir, name)
+                extent = params["extent"]*np.sqrt(scale)
+                inputs[name] = dict(
+                        srtmDir=directory,
+                        minLat=originLat-extent/2, maxLat=originLat+extent/2,
+                        minLon=originLon-extent/2, maxLon=originLon+extent/2
+                )
+                if not os.path.isdir(directory):
+                        os.makedirs(directory)
+                for lat in (originLat-1, originLat):
+                        for lon in (originLon-1, originLon):
+                                if not os.path.isfile(os.path.join(directory, "%s.hgt" % getTileName(lat, lon))):
+                                        generators.writeHgtTile(directory, lat, lon, params["tileSize"], seed)
+        inputs["grid"] = os.path.join(dataDir, "bench.grid")
+        if not os.path.isfile(inputs["grid"]):
+                factor = np.sqrt(scale)
+                generators.writeGrid(
+                        inputs["grid"],
+                        max(int(cases["grid"]["nx"]*factor), 2), max(int(cases["grid"]["ny"]*factor), 2),
+                        originLat, originLon, seed=seed
+                )
+        inputs["gridh"] = os.path.join(dataDir, "benchh.grid")
+        if not os.path.isfile(inputs["gridh"]):
+                convertGrid(inputs["grid"], inputs["gridh"], True)
+        inputs["grid2"] = os.path.join(dataDir, "bench2.grid")
+        if not os.path.isfile(inputs["grid2"]):
+                convertGrid(inputs["grid"], inputs["grid2"])
+        inputs["flt"] = os.path.join(dataDir, "bench.flt")
+        if not os.path.isfile(inputs["flt"]):
+                factor = np.sqrt(scale)
+                generators.writeFltRaster(
+                        inputs["flt"],
+                        max(int(cases["flt"]["nx"]*factor), 2), max(int(cases["flt"]["ny"]*factor), 2),
+                        originX, originY, seed=seed
+                )
+        inputs["path"] = os.path.join(dataDir, "bench.path")
+        if not os.path.isfile(inputs["path"]):
+                generators.writePath(inputs["path"], max(int(cases["path"]["numPoints"]*scale), 2), originLat, originLon, seed=seed)
+        return inputs
+
+
+def runCase(name, inputs, primitiveType, timer):
+        """
+        Builds the mesh for the case
+        Returns the tuple (number of vertices, number of faces or edges)
+        """
+        if name in ("srtm3", "srtm1"):
+                params = inputs[name]
+                engine = Srtm(
+                        projection=TransverseMercator(lat=originLat, lon=originLon),
+                        primitiveType=primitiveType,
+                        maxError=1,
+                        fillVoids=True,
+                        **params
+                )
+                engine.detectSize()
+                (verts, indices) = timer.wrap("read", engine.build)()[:2]
+                hgt_tiles.releaseTiles()
+        elif name in ("grid", "gridh", "grid2", "flt"):
+                (f, (nx, ny, incx, incy, minLon, minLat), layout) = openGrid(inputs[name])
+                with f:
+                        engine = PtArray(
+                                nx=nx, ny=ny, incx=incx, incy=incy, minlon=minLon, minlat=minLat,
+                                f=f, layout=layout,
+                                projection=TransverseMercator(lat=minLat, lon=minLon) if layout.get("geographic", True)
+                                        else PlanarProjection(x=minLon, y=minLat),
+                                primitiveType=primitiveType,
+                                maxError=1
+                        )
+                        (verts, indices) = timer.wrap("read", engine.build)()[:2]
+        else:
+                with open(inputs[name]) as f:
+                        engine = PtPath(f=f, projection=TransverseMercator(lat=originLat, lon=originLon))
+                        (verts, indices) = timer.wrap("read", engine.build)()
+                timer.wrap("mesh", mesh_builder.createMesh)(name, verts, edges=indices)
+                return (len(verts), len(indices))
+        timer.wrap("mesh", mesh_builder.createMesh)(name, verts, indices)
+        return (len(verts), len(indices))
+
+
+def benchmark(name, inputs, primitiveType, repeat):
+        """
+        Returns the dictionary with the results of the case
+        """
+        best = dict((stage, float("inf")) for stage in stages)
+        for i in range(repeat):
+                timer = StageTimer()
+                timer.patch()
+                try:
+                        (numVerts, numIndices) = runCase(name, inputs, primitiveType, timer)
+                finally:
+                        timer.restore()
+                for stage in stages:
+                        best[stage] = min(best[stage], timer.times[stage])
+        # the peak memory is captured in a separate run, since tracemalloc slows down the allocations
+        tracemalloc.start()
+        try:
+                runCase(name, inputs, primitiveType, StageTimer())
+                peakMemory = tracemalloc.get_traced_memory()[1]
+        finally:
+                tracemalloc.stop()
+        return OrderedDict((
+                ("stages", OrderedDict((stage, best[stage]) for stage in stages)),
+                ("total", sum(best.values())),
+                ("peakMemory", peakMemory),
+                ("verts", numVerts),
+                ("indices", numIndices)
+        ))
+
+
+def compare(results, baseline, tolerance, memoryTolerance, minDelta):
+        """
+        Prints the comparison of the results with the baseline
+        Returns the list of the regressions
+        """
+        regressions = []
+        for name in results:
+                if name not in baseline["results"]:
+                        print("%s: not in the baseline" % name)
+                        continue
+                current = results[name]
+                base = baseline["results"][name]
+                if (current["verts"], current["indices"]) != (base["verts"], base["indices"]):
+                        print("%s: the mesh differs from the baseline, %s verts %s faces against %s verts %s faces" %
+                                (name, current["verts"], current["indices"], base["verts"], base["indices"]))
+                timings = [(stage, current["stages"][stage], base["stages"][stage]) for stage in stages]
+                timings.append(("total", current["total"], base["total"]))
+                for (stage, value, baseValue) in timings:
+                        regression = value > baseValue*(1.+tolerance) and value-baseValue > minDelta
+                        print("%-6s %-9s %8.3fs  baseline %8.3fs  %+6.1f%%%s" % (
+                                name, stage, value, baseValue, 100.*(value/baseValue-1.) if baseValue else 0.,
+                                "  REGRESSION" if regression else ""
+                        ))
+                        if regression:
+                                regressions.append("%s %s" % (name, stage))
+                regression = current["peakMemory"] > base["peakMemory"]*(1.+memoryTolerance)
+                print("%-6s %-9s %7.1fMB  baseline %7.1fMB%s" % (
+                        name, "memory", current["peakMemory"]/1e6, base["peakMemory"]/1e6, "  REGRESSION" if regression else ""
+                ))
+                if regression:
+                        regressions.append("%s memory" % name)
+        return regressions
+
+
+def main(args):
+        parser = argparse.ArgumentParser(description="Benchmarks of the importer engines")
+        parser.add_argument("cases", nargs="*", help="the cases to run: %s, all of them by default" % ", ".join(cases))
+        parser.add_argument("--scale", type=float, default=1., help="the factor for the number of the posts or points of the cases")
+        parser.add_argument("--seed", type=int, default=0, help="the seed of the generators")
+        parser.add_argument("--repeat", type=int, default=3, help="the number of the timed runs of each case")
+        parser.add_argument("--primitive-type", default="quad", choices=("quad", "triangle", "rtin"))
+        parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "actrack_benchmark_data"))
+        parser.add_argument("--baseline", default=os.path.join(benchmarkDir, "baseline.json"))
+        parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline")
+        parser.add_argument("--tolerance", type=float, default=0.25, help="the allowed relative slowdown of a stage")
+        parser.add_argument("--memory-tolerance", type=float, default=0.1, help="the allowed relative increase of the peak memory")
+        parser.add_argument("--min-delta", type=float, default=0.02, help="slowdowns below this number of seconds are ignored")
+        args = parser.parse_args(args)
+        for name in args.cases:
+                if name not in cases:
+                        parser.error("unknown case %s" % name)
+
+        names = args.cases or list(cases)
+        inputs = prepareData(args.data_dir, args.scale, args.seed)
+        parameters = OrderedDict((("scale", args.scale), ("seed", args.seed), ("primitiveType", args.primitive_type)))
+        results = OrderedDict()
+        for name in names:
+                results[name] = benchmark(name, inputs, args.primitive_type, args.repeat)
+                print("%-6s %s  total %.3fs  peak memory %.1fMB  %s verts" % (
+                        name,
+                        "  ".join("%s %.3fs" % (stage, results[name]["stages"][stage]) for stage in stages),
+                        results[name]["total"],
+                        results[name]["peakMemory"]/1e6,
+                        results[name]["verts"]
+                ))
+
+        if args.save_baseline:
+                baseline = {"results": {}}
+                if os.path.isfile(args.baseline):
+                        with open(args.baseline) as f:
+                                baseline = json.load(f)
+                        if baseline.get("parameters") != parameters:
+                                baseline["results"] = {}
+                baseline["parameters"] = parameters
+                baseline["machine"] = "%s, %s, Python %s, NumPy %s" % (
+                        platform.node(), platform.processor() or platform.machine(), platform.python_version(), np.__version__
+                )
+                baseline["results"].update(results)
+                with open(args.baseline, "w") as f:
+                        json.dump(baseline, f, indent=4)
+                print("The baseline is saved to %s" % args.baseline)
+                return 0
+
+        if not os.path.isfile(args.baseline):
+                print("No baseline at %s, run with --save-baseline first" % args.baseline)
+                return 0
+        with open(args.baseline) as f:
+                baseline = json.load(f, object_pairs_hook=OrderedDict)
+        if baseline.get("parameters") != parameters:
+                print("The baseline was recorded with %s, run with the same parameters to compare"
+                        % json.dumps(baseline.get("parameters")))
+                return 1
+        print("Baseline: %s" % baseline.get("machine"))
+        regressions = compare(results, baseline, args.tolerance, args.memory_tolerance, args.min_delta)
+        if regressions:
+                print("Regressions: %s" % ", ".join(regressions))
+                return 1
+        return 0
+
+
+if __name__ == "__main__":
+        sys.exit(main(sys.argv[1:]))
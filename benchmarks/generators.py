@@ -0,0 +1,120 @@
+"""
+Deterministic generators of synthetic input files for the importer benchmarks
+
+The heights are a smooth function of the latitude and the longitude with some noise on top,
+so neighboring tiles fit together and the adaptive triangulation sees a realistic surface.
+The same seed always gives the same files.
+"""
+
+import os
+import numpy as np
+
+from tile_index import getTileName
+
+
+def getTerrain(lats, lons, seed=0):
+        """
+        Returns the array of the heights in meters for the latitudes and longitudes, they are broadcast against each other
+        """
+        random = np.random.RandomState(seed)
+        heights = 800.
+        # a sum of waves with random directions, wave lengths and phases
+        for amplitude in (600., 300., 120., 40.):
+                (kLat, kLon) = random.uniform(-1., 1., 2) * 2.*np.pi * 600./amplitude
+                heights = heights + amplitude*np.sin(kLat*lats + kLon*lons + random.uniform(0., 2.*np.pi))
+        return heights
+
+
+def addNoise(heights, seed, amplitude=3.):
+        return heights + np.random.RandomState(seed).uniform(-amplitude, amplitude, heights.shape)
+
+
+def getVoidMask(shape, seed, voidFraction):
+        """
+        Returns a boolean array marking the void posts: rectangular patches
+        of up to 24 x 24 posts covering about voidFraction of the posts
+        """
+        void = np.zeros(shape, dtype=bool)
+        if not voidFraction:
+                return void
+        random = np.random.RandomState(seed)
+        # the mean area of a patch is 12.5*12.5 posts
+        numPatches = max(int(voidFraction*shape[0]*shape[1]/156.), 1)
+        rows = random.randint(0, shape[0], numPatches)
+        cols = random.randint(0, shape[1], numPatches)
+        sizes = random.randint(1, 25, (numPatches, 2))
+        for (row, col, (height, width)) in zip(rows, cols, sizes):
+                void[row:row+height, col:col+width] = True
+        return void
+
+
+def writeHgtTile(directory, lat, lon, size=1200, seed=0, voidFraction=0.005):
+        """
+        Writes a synthetic SRTM tile with the lower-left corner at lat, lon
+        size is 1200 for SRTM3 or 3600 for SRTM1
+        voidFraction is the approximate fraction of the void posts
+        Returns the path of the tile
+        """
+        # the rows go from the north to the south
+        lats = lat + 1. - np.arange(size+1)/size
+        lons = lon + np.arange(size+1)/size
+        tileSeed = seed*100000 + (lat+90)*360 + lon+180
+        heights = addNoise(getTerrain(lats[:,None], lons, seed), tileSeed)
+        heights = np.rint(heights).astype(">i2")
+        heights[getVoidMask(heights.shape, tileSeed, voidFraction)] = -32768
+        path = os.path.join(directory, getTileName(lat, lon) + ".hgt")
+        heights.tofile(path)
+        return path
+
+
+def writeGrid(path, nx, ny, minLat, minLon, increment=0.0001, seed=0):
+        """
+        Writes a synthetic .grid file with nx*ny posts, see pt_array
+        """
+        lats = minLat + np.arange(ny)*increment
+        lons = minLon + np.arange(nx)*increment
+        heights = addNoise(getTerrain(lats[:,None], lons, seed), seed)
+        with open(path, "w") as f:
+                f.write("%d %d %.10g %.10g %.10g %.10g\n" % (nx, ny, increment, increment, minLon, minLat))
+                np.savetxt(
+                        f,
+                        np.column_stack((np.repeat(lats, nx), np.tile(lons, ny), heights.reshape(-1))),
+                        fmt="%.6f %.6f %.3f"
+                )
+        return path
+
+
+def writeFltRaster(path, nx, ny, minX, minY, cellSize=1., seed=0, voidFraction=0.005, noData=-9999.):
+        """
+        Writes a synthetic .flt raster with nx*ny cells of cellSize meters and its .hdr file,
+        like a LiDAR DEM in projected coordinates with the lower-left corner at minX, minY, see dem_formats
+        voidFraction is the approximate fraction of the cells with the height noData
+        """
+        # the rows go from the north to the south
+        ys = minY + (ny - 0.5 - np.arange(ny))*cellSize
+        xs = minX + (np.arange(nx) + 0.5)*cellSize
+        # about 111 km per degree for the terrain function
+        heights = addNoise(getTerrain(ys[:,None]/111000., xs/111000., seed), seed, 0.2).astype("<f4")
+        heights[getVoidMask(heights.shape, seed, voidFraction)] = noData
+        heights.tofile(path)
+        with open(os.path.splitext(path)[0] + ".hdr", "w") as f:
+                f.write("ncols %d\nnrows %d\nxllcorner %r\nyllcorner %r\ncellsize %r\nNODATA_value %r\nbyteorder LSBFIRST\n" %
+                        (nx, ny, minX, minY, cellSize, noData))
+        return path
+
+
+def writePath(path, numPoints, lat, lon, step=0.00005, seed=0):
+        """
+        Writes a synthetic .path file with numPoints points of a random walk starting at lat, lon,
+        see io_import_scene_path
+        step is the mean distance between the consecutive points in degrees
+        """
+        random = np.random.RandomState(seed)
+        # the heading changes slowly, like along a road
+        heading = np.cumsum(random.normal(0., 0.05, numPoints))
+        lats = lat + np.cumsum(step*np.cos(heading))
+        lons = lon + np.cumsum(step*np.sin(heading))
+        heights = getTerrain(lats, lons, seed) + 1.
+        with open(path, "w") as f:
+                np.savetxt(f, np.column_stack((lats, lons, heights)), fmt="%.7f %.7f %.3f")
+        return path
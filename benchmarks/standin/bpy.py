@@ -0,0 +1,153 @@
+"""
+A minimal stand-in for Blender's bpy module, just enough to import the addons and
+to run mesh_builder.createMesh(..) outside of Blender
+
+The mesh collections copy the arrays passed to foreach_set(..) like Blender does,
+so the time of the mesh stage includes the conversion and copying of the arrays,
+but not Blender's own work on the mesh (e.g. the edges calculated by mesh.update(..))
+"""
+
+import numpy as np
+
+
+class _Collection:
+
+        def __init__(self, **attributes):
+                # the key is the attribute name, the value is the tuple (dtype, number of values per item)
+                self.attributes = attributes
+                self.values = {}
+                self.count = 0
+
+        def __len__(self):
+                return self.count
+
+        def add(self, count):
+                self.count += count
+
+        def foreach_set(self, name, seq):
+                (dtype, width) = self.attributes[name]
+                values = np.empty(self.count*width, dtype=dtype)
+                values[:] = seq
+                self.values[name] = values
+
+        def foreach_get(self, name, seq):
+                seq[:] = self.values[name]
+
+
+class Mesh:
+
+        def __init__(self, name):
+                self.name = name
+                self.vertices = _Collection(co=(np.float32, 3))
+                self.edges = _Collection(vertices=(np.int32, 2))
+                self.loops = _Collection(vertex_index=(np.int32, 1), edge_index=(np.int32, 1))
+                self.polygons = _Collection(loop_start=(np.int32, 1), loop_total=(np.int32, 1))
+
+        def update(self, calc_edges=False):
+                pass
+
+
+class _VertexGroup:
+
+        def __init__(self, name):
+                self.name = name
+                self.indices = []
+
+        def add(self, indices, weight, type):
+                self.indices.extend(indices)
+
+
+class _VertexGroups(list):
+
+        def new(self, name):
+                group = _VertexGroup(name)
+                self.append(group)
+                return group
+
+
+class Object(dict):
+
+        def __init__(self, name, data):
+                self.name = name
+                self.data = data
+                self.vertex_groups = _VertexGroups()
+
+
+class _Datablocks(list):
+
+        def __init__(self, factory):
+                self.factory = factory
+
+        def new(self, *args):
+                datablock = self.factory(*args)
+                self.append(datablock)
+                return datablock
+
+        def remove(self, datablock):
+                list.remove(self, datablock)
+
+
+class _Data:
+
+        def __init__(self):
+                self.meshes = _Datablocks(Mesh)
+                self.objects = _Datablocks(Object)
+
+
+data = _Data()
+
+
+class _Menu(list):
+
+        def remove(self, func):
+                if func in self:
+                        list.remove(self, func)
+
+
+class _Types:
+
+        class Operator:
+                pass
+
+        class Panel:
+                pass
+
+        class PropertyGroup:
+                pass
+
+        INFO_MT_file_import = _Menu()
+
+
+types = _Types()
+
+
+def _property(**kwargs):
+        # the class attribute gets the default value of the property
+        return kwargs.get("default")
+
+
+class _Props:
+        BoolProperty = staticmethod(_property)
+        IntProperty = staticmethod(_property)
+        FloatProperty = staticmethod(_property)
+        StringProperty = staticmethod(_property)
+        EnumProperty = staticmethod(_property)
+        PointerProperty = staticmethod(_property)
+        CollectionProperty = staticmethod(_property)
+
+
+props = _Props()
+
+
+class _Utils:
+
+        @staticmethod
+        def register_class(cls):
+                pass
+
+        @staticmethod
+        def unregister_class(cls):
+                pass
+
+
+utils = _Utils()
@@ -0,0 +1,7 @@
+"""
+A minimal stand-in for Blender's bpy_extras.io_utils module, see bpy.py
+"""
+
+
+class ImportHelper:
+        filepath = ""
@@ -0,0 +1,15 @@
+"""
+A minimal stand-in for Blender's mathutils module, see bpy.py next to it
+"""
+
+
+class Vector(tuple):
+
+        def __new__(cls, values):
+                return tuple.__new__(cls, values)
+
+
+class Matrix(tuple):
+
+        def __new__(cls, rows=((1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1))):
+                return tuple.__new__(cls, (Vector(row) for row in rows))
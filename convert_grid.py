@@ -0,0 +1,29 @@
+"""
+Converts a text .grid file with the lines "lat lon height" to the binary .grid (version 2) format
+or to the height-only text format, see pt_array.py
+
+Usage:
+    python convert_grid.py [--heights] input.grid output.grid
+
+--heights writes the height-only text format, it requires the posts to follow the header geometry.
+The importer detects the format of a .grid file by itself, so the output keeps the .grid extension.
+"""
+
+import sys
+
+from pt_array import convertGrid
+
+
+if __name__ == "__main__":
+        args = sys.argv[1:]
+        heightsOnly = "--heights" in args
+        if heightsOnly:
+                args.remove("--heights")
+        if len(args) != 2:
+                print(__doc__)
+                sys.exit(1)
+        try:
+                convertGrid(args[0], args[1], heightsOnly)
+        except ValueError as e:
+                print(e)
+                sys.exit(1)
@@ -54,6 +54,10 @@ import bpy
 from mathutils import *
 from bpy.props import *
 
+import numpy as np
+
+from mesh_builder import createMesh
+
 print("----------")
 
 
@@ -577,18 +581,14 @@ class LoftOperator(bpy.types.Operator):
         verts = loft(objs, steps, spans, intype)
 
         nfaces = steps*spans*(len(objs)-1)
-        faces=[]
-        for i in range(0, nfaces):
-            d = int(i/steps)
-            f = [i+d,i+d+1, i+d+steps+2, i+d+steps+1]
-            #inverts normals
-            #f = [i+d,i+d+steps+1, i+d+steps+2, i+d+1]
-            faces.append(f)
-
-
-        me = bpy.data.meshes.new("Loft")
-        me.from_pydata(verts,[], faces)
-        me.update()
+        i = np.arange(nfaces)
+        d = i//steps
+        faces = np.column_stack((i+d, i+d+1, i+d+steps+2, i+d+steps+1))
+        #inverts normals
+        #faces = np.column_stack((i+d, i+d+steps+1, i+d+steps+2, i+d+1))
+
+
+        me = createMesh("Loft", verts, faces)
         newobj = bpy.data.objects.new("Loft", me)
         #newobj.data = me
         scn = context.scene
@@ -792,18 +792,13 @@ class Birail1Operator(bpy.types.Operator):
         verts = birail1(objs, steps, spans, prop)
 
         if verts!=[]:
-            faces=[]
-
             nfaces = (steps-1)*(spans-1)
 
-            for i in range(0, nfaces):
-                d = int(i/(steps-1))
-                f = [i+d+1, i+d, i+d+steps, i+d+steps+1 ]
-                faces.append(f)
+            i = np.arange(nfaces)
+            d = i//(steps-1)
+            faces = np.column_stack((i+d+1, i+d, i+d+steps, i+d+steps+1))
 
-            me = bpy.data.meshes.new("Birail")
-            me.from_pydata(verts,[], faces)
-            me.update()
+            me = createMesh("Birail", verts, faces)
             newobj = bpy.data.objects.new("Birail", me)
             newobj.data = me
 
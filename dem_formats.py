@@ -0,0 +1,201 @@
+"""
+Readers of the common raster DEM formats for the grid importer, see pt_array.openGrid(..)
+
+An ESRI ASCII grid (.asc) starts with the header lines "ncols", "nrows", "xllcorner" or "xllcenter",
+"yllcorner" or "yllcenter", "cellsize" (or "dx" and "dy") and the optional "NODATA_value"
+(-9999 by default), followed by nrows rows of ncols heights starting from the northern row.
+
+A raw raster is a .flt (ESRI GridFloat) or .bil (ESRI band interleaved by line) file with the heights
+of a single band stored row by row starting from the northern row; its .hdr sidecar holds "key value" lines:
+the .flt header has the same keys as the ESRI ASCII header and "byteorder" (LSBFIRST or MSBFIRST),
+the .bil header has "nrows", "ncols", "nbits", "pixeltype", "byteorder" (I or M), "ulxmap", "ulymap",
+"xdim", "ydim", "nodata" and optionally "nbands", "skipbytes", "bandrowbytes", "totalrowbytes".
+The raw rasters are memory mapped by the importer.
+
+The coordinates of a raster are either geographic (longitude and latitude in degrees) or
+projected (x and y in meters of an unknown coordinate system), see isGeographic(..).
+
+The module doesn't depend on Blender.
+"""
+
+import os
+import numpy as np
+
+
+# the extensions of the raw rasters
+rawExtensions = (".flt", ".bil")
+
+# the data types of the .bil rasters for the pairs (pixeltype, nbits)
+bilDtypes = {
+        ("SIGNEDINT", 8): "i1",
+        ("UNSIGNEDINT", 8): "u1",
+        ("SIGNEDINT", 16): "i2",
+        ("UNSIGNEDINT", 16): "u2",
+        ("SIGNEDINT", 32): "i4",
+        ("UNSIGNEDINT", 32): "u4",
+        ("FLOAT", 32): "f4",
+        ("FLOAT", 64): "f8"
+}
+
+byteOrders = {"I": "<", "LSBFIRST": "<", "M": ">", "MSBFIRST": ">"}
+
+# the height of the void posts of an ESRI ASCII grid without "NODATA_value"
+esriAsciiNoData = "-9999"
+
+
+def openEsriAscii(filepath):
+        """
+        Opens the ESRI ASCII grid
+        Returns the tuple (f, header, layout) like pt_array.openGrid(..), the text file f is positioned at the heights
+        Raises ValueError for a file with an invalid header
+        """
+        f = open(filepath)
+        try:
+                keys = {}
+                lineNumber = 1
+                while True:
+                        position = f.tell()
+                        line = f.readline()
+                        tokens = line.split()
+                        if not tokens or not tokens[0][0].isalpha():
+                                # the first row of the heights
+                                f.seek(position)
+                                break
+                        if len(tokens) != 2:
+                                raise ValueError("Invalid line %s of the ESRI ASCII grid %s: %s" % (lineNumber, filepath, line.strip()))
+                        keys[tokens[0].lower()] = tokens[1]
+                        lineNumber += 1
+                # the default of the ESRI ASCII grid format
+                keys.setdefault("nodata_value", esriAsciiNoData)
+                (header, nodata) = getRasterHeader(keys, filepath)
+                return (f, header, {
+                        "format": "text",
+                        "arrays": ("heights",),
+                        "firstLine": lineNumber,
+                        "northFirst": True,
+                        "void": nodata,
+                        "geographic": isGeographic(filepath, header)
+                })
+        except:
+                f.close()
+                raise
+
+
+def openRawRaster(filepath):
+        """
+        Opens the .flt or .bil raster, its header is read from the .hdr file next to it
+        Returns the tuple (f, header, layout) like pt_array.openGrid(..), the file f is opened in the binary mode
+        Raises ValueError for a raster with an invalid or missing header or for a truncated raster
+        """
+        keys = readHdr(os.path.splitext(filepath)[0] + ".hdr")
+        isBil = filepath.lower().endswith(".bil")
+        if isBil:
+                if int(keys.get("nbands", 1)) != 1:
+                        raise ValueError("Only the rasters with a single band are supported, %s has %s" % (filepath, keys["nbands"]))
+                dtype = bilDtypes.get((keys.get("pixeltype", "SIGNEDINT").upper(), int(keys.get("nbits", 8))))
+                if not dtype:
+                        raise ValueError("Unsupported pixel type %s with %s bits of %s" %
+                                (keys.get("pixeltype", "SIGNEDINT"), keys.get("nbits", 8), filepath))
+        else:
+                dtype = "f4"
+        byteOrder = keys.get("byteorder", "I").upper()
+        if byteOrder not in byteOrders:
+                raise ValueError("Unknown byte order %s of %s" % (byteOrder, filepath))
+        dtype = np.dtype(byteOrders[byteOrder] + dtype)
+        (header, nodata) = getRasterHeader(keys, filepath)
+        nx = header[0]
+        rowBytes = int(keys.get("totalrowbytes", keys.get("bandrowbytes", nx*dtype.itemsize)))
+        if rowBytes < nx*dtype.itemsize or rowBytes % dtype.itemsize:
+                raise ValueError("Invalid row size of %s bytes of %s" % (rowBytes, filepath))
+        offset = int(keys.get("skipbytes", 0))
+        f = open(filepath, "rb")
+        if os.fstat(f.fileno()).st_size < offset + header[1]*rowBytes:
+                f.close()
+                raise ValueError("The raster file %s is truncated" % filepath)
+        return (f, header, {
+                "format": "raw",
+                "arrays": ("heights",),
+                "dtype": dtype,
+                "offset": offset,
+                # the number of the values in a row of the file including the padding
+                "rowLength": rowBytes // dtype.itemsize,
+                "northFirst": True,
+                "void": nodata,
+                "geographic": isGeographic(filepath, header)
+        })
+
+
+def readHdr(filepath):
+        """
+        Reads the .hdr file with the lines "key value"
+        Returns the dictionary of the values with the lower case keys
+        Raises ValueError if the file is missing
+        """
+        if not os.path.isfile(filepath):
+                raise ValueError("The header file %s is missing" % filepath)
+        keys = {}
+        with open(filepath) as f:
+                for line in f:
+                        tokens = line.split()
+                        if len(tokens) >= 2:
+                                keys[tokens[0].lower()] = tokens[1]
+        return keys
+
+
+def getRasterHeader(keys, filepath):
+        """
+        Returns the tuple (header, nodata) for the dictionary keys of the raster header with the lower case keys
+        header is the tuple (nx, ny, incx, incy, minx, miny) like pt_array.readGridHeader(..) returns,
+        minx and miny are the coordinates of the center of the south-western cell
+        nodata is the height of the void posts or None
+        """
+        try:
+                nx = int(keys["ncols"])
+                ny = int(keys["nrows"])
+                if "ulxmap" in keys:
+                        # the center of the north-western cell
+                        incx = float(keys["xdim"])
+                        incy = float(keys["ydim"])
+                        minx = float(keys["ulxmap"])
+                        miny = float(keys["ulymap"]) - (ny-1)*incy
+                else:
+                        if "cellsize" in keys:
+                                incx = incy = float(keys["cellsize"])
+                        else:
+                                incx = float(keys["dx"])
+                                incy = float(keys["dy"])
+                        minx = float(keys["xllcenter"]) if "xllcenter" in keys else float(keys["xllcorner"]) + incx/2
+                        miny = float(keys["yllcenter"]) if "yllcenter" in keys else float(keys["yllcorner"]) + incy/2
+                nodata = keys.get("nodata_value", keys.get("nodata"))
+                nodata = None if nodata is None else float(nodata)
+        except KeyError as e:
+                raise ValueError("The header of %s doesn't have the key %s" % (filepath, e.args[0]))
+        except ValueError:
+                raise ValueError("Invalid header of %s" % filepath)
+        if nx < 1 or ny < 1 or incx <= 0 or incy <= 0:
+                raise ValueError("Invalid header of %s" % filepath)
+        return ((nx, ny, incx, incy, minx, miny), nodata)
+
+
+def isGeographic(filepath, header):
+        """
+        Checks if the coordinates of the raster are geographic
+        The .prj file next to the raster decides if there is one: a WKT coordinate system with PROJCS
+        or an ESRI one with a projection other than GEOGRAPHIC is projected;
+        otherwise the raster is geographic if its extent fits the ranges of the longitude and the latitude
+        and its cells are smaller than a degree
+        """
+        prjPath = os.path.splitext(filepath)[0] + ".prj"
+        if os.path.isfile(prjPath):
+                with open(prjPath) as f:
+                        prj = f.read().upper()
+                if "PROJCS" in prj:
+                        return False
+                if "GEOGCS" in prj:
+                        return True
+                tokens = prj.split()
+                if "PROJECTION" in tokens[:-1]:
+                        return tokens[tokens.index("PROJECTION")+1] == "GEOGRAPHIC"
+        (nx, ny, incx, incy, minx, miny) = header
+        return incx < 1. and incy < 1. and -180. <= minx and minx + (nx-1)*incx <= 360. \
+                and -90. <= miny and miny + (ny-1)*incy <= 90.
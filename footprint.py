@@ -0,0 +1,174 @@
+"""
+A footprint limiting the imported terrain to the area around a track outline
+and the mesh density graded with the distance from a track centerline
+
+The footprint is defined by line segments in the plane of the projection:
+the posts within the buffer distance of any segment belong to it, as well as the posts
+inside the closed boundary (e.g. the outline of a filled polygon). So a curve gives a corridor,
+a polygon gives its area extended by the buffer distance.
+
+The tests are done on the projected posts of a raster. The posts are tested only within the window
+of the raster rows and columns overlapping the bounding box of a segment, the test itself
+is vectorized over the posts of the window.
+"""
+
+import hashlib
+import numpy as np
+
+
+class Footprint:
+
+        def __init__(self, segments, boundary=None, buffer=0):
+                """
+                segments is an array of the line segments with the shape (m, 2, 2): m segments, 2 points, x and y
+                boundary is an array of the segments of closed polygons with the same layout, can be None
+                buffer is the distance from the segments in meters
+                """
+                self.segments = np.asarray(segments, dtype=np.float64).reshape(-1, 2, 2)
+                self.boundary = np.zeros((0, 2, 2)) if boundary is None else np.asarray(boundary, dtype=np.float64).reshape(-1, 2, 2)
+                self.buffer = buffer
+
+        def getBounds(self):
+                """
+                Returns the tuple (xmin, ymin, xmax, ymax) of the footprint including the buffer
+                """
+                points = np.concatenate((self.segments, self.boundary)).reshape(-1, 2)
+                (xmin, ymin) = points.min(axis=0) - self.buffer
+                (xmax, ymax) = points.max(axis=0) + self.buffer
+                return (xmin, ymin, xmax, ymax)
+
+        def getKey(self):
+                """
+                Returns a string identifying the footprint, e.g. for a cache key
+                """
+                h = hashlib.sha1(self.segments.tobytes())
+                h.update(self.boundary.tobytes())
+                h.update(repr(self.buffer).encode("utf-8"))
+                return h.hexdigest()
+
+        def getMask(self, x, y):
+                """
+                Returns a boolean array marking the posts of the footprint
+                x and y are the projected coordinates of the raster posts with the shape (rows, cols),
+                see RasterWindow for their order
+                """
+                mask = np.zeros(x.shape, dtype=bool)
+                if not x.size:
+                        return mask
+                window = RasterWindow(x, y)
+                buffer2 = self.buffer*self.buffer
+                for ((x1, y1), (x2, y2)) in self.segments:
+                        (rows, cols) = window.get(
+                                min(x1, x2) - self.buffer, min(y1, y2) - self.buffer,
+                                max(x1, x2) + self.buffer, max(y1, y2) + self.buffer
+                        )
+                        if rows.start >= rows.stop or cols.start >= cols.stop:
+                                continue
+                        # the squared distance from the posts of the window to the segment
+                        px = x[rows, cols] - x1
+                        py = y[rows, cols] - y1
+                        dx = x2 - x1
+                        dy = y2 - y1
+                        length2 = dx*dx + dy*dy
+                        t = np.clip((px*dx + py*dy)/length2, 0, 1) if length2 else 0
+                        px -= t*dx
+                        py -= t*dy
+                        mask[rows, cols] |= px*px + py*py <= buffer2
+                # even-odd rule: a post is inside if a ray from it towards the west crosses the boundary an odd number of times
+                inside = np.zeros(x.shape, dtype=bool)
+                for ((x1, y1), (x2, y2)) in self.boundary:
+                        if y1 == y2:
+                                continue
+                        (rows, cols) = window.get(min(x1, x2), min(y1, y2), np.inf, max(y1, y2))
+                        if rows.start >= rows.stop or cols.start >= cols.stop:
+                                continue
+                        px = x[rows, cols]
+                        py = y[rows, cols]
+                        # the half-open interval of y avoids counting a shared vertex of two segments twice
+                        crossing = (py >= min(y1, y2)) & (py < max(y1, y2))
+                        crossing &= px > x1 + (py - y1)*(x2 - x1)/(y2 - y1)
+                        inside[rows, cols] ^= crossing
+                mask |= inside
+                return mask
+
+
+class RasterWindow:
+        """
+        Finds the window of the raster rows and columns overlapping a bounding box in the plane of the projection
+        The projected y must change monotonically along the columns, the projected x along the rows
+        """
+
+        def __init__(self, x, y):
+                self.rowMinY = y.min(axis=1)
+                self.rowMaxY = y.max(axis=1)
+                self.colMinX = x.min(axis=0)
+                self.colMaxX = x.max(axis=0)
+
+        def get(self, xmin, ymin, xmax, ymax):
+                """
+                Returns the tuple of the slices (rows, cols)
+                """
+                return (
+                        slice(*_getRange(self.rowMinY, self.rowMaxY, ymin, ymax)),
+                        slice(*_getRange(self.colMinX, self.colMaxX, xmin, xmax))
+                )
+
+
+def _getRange(minValues, maxValues, low, high):
+        """
+        Returns the tuple (first, last+1) of the indices with the interval minValues..maxValues overlapping low..high
+        minValues and maxValues are either both increasing or both decreasing
+        """
+        if minValues[0] <= minValues[-1]:
+                return (np.searchsorted(maxValues, low, "left"), np.searchsorted(minValues, high, "right"))
+        # e.g. the rows of a raster going from the north to the south
+        return (np.searchsorted(-minValues, -high, "left"), np.searchsorted(-maxValues, -low, "right"))
+
+
+def getGradedSpacing(x, y, centerline, schedule):
+        """
+        Returns the array with the spacing of the mesh posts allowed at each post of the raster
+        for rtin.triangulate(..), graded with the distance from the centerline
+        x and y are the projected coordinates of the raster posts, see Footprint.getMask(..)
+        centerline is an array of the line segments, see Footprint
+        schedule is a list of tuples (distance, spacing) sorted by the distance: starting from the distance
+        in meters, the spacing in posts is used, e.g. ((0, 1), (500, 4), (2000, 16));
+        the first spacing is used up to the second distance whatever the first distance is
+        The band borders are found on the raster decimated with the spacing inside the band,
+        that's precise enough for the spacing and cheap for the wide outer bands
+        """
+        (numRows, numCols) = x.shape
+        result = np.full(x.shape, schedule[-1][1], dtype=np.float32)
+        # the bands from the outer to the inner ones, the inner ones overwrite the outer ones
+        for i in range(len(schedule)-2, -1, -1):
+                spacing = schedule[i][1]
+                step = max(int(spacing), 1)
+                # the offset centers each decimated post in the block of the posts it stands for
+                rowOffset = min(step//2, numRows-1)
+                colOffset = min(step//2, numCols-1)
+                mask = Footprint(centerline, None, schedule[i+1][0]).getMask(
+                        x[rowOffset::step, colOffset::step],
+                        y[rowOffset::step, colOffset::step]
+                )
+                rows = np.minimum(np.arange(numRows)//step, mask.shape[0]-1)
+                cols = np.minimum(np.arange(numCols)//step, mask.shape[1]-1)
+                result[mask[np.ix_(rows, cols)]] = spacing
+        return result
+
+
+def parseSchedule(schedule):
+        """
+        Parses the string "distance:spacing, distance:spacing, ..." to a list of tuples sorted by the distance,
+        see getGradedSpacing(..)
+        Raises ValueError for an invalid string
+        """
+        try:
+                result = sorted(
+                        (float(distance), float(spacing))
+                        for (distance, spacing) in (item.split(":") for item in schedule.split(",") if item.strip())
+                )
+        except ValueError:
+                raise ValueError("Invalid distance schedule '%s', expected distance:spacing, distance:spacing, ..." % schedule)
+        if not result or any(spacing < 1 for (distance, spacing) in result):
+                raise ValueError("Invalid distance schedule '%s', the spacing must be at least 1" % schedule)
+        return result
@@ -0,0 +1,280 @@
+"""
+Access to SRTM elevation tiles in the .hgt format
+
+A .hgt file holds (size+1)x(size+1) big-endian signed two byte integers stored row by row,
+starting from the northern edge of the tile.
+size is 1200 for SRTM3 (three arc-seconds) and 3600 for SRTM1 (one arc-second) data;
+it is detected from the file size by getTileSize(..).
+
+Tiles compressed as .hgt.zip or .hgt.gz are read directly from the archive: the samples are
+decompressed into a buffer, only up to the southernmost row requested so far.
+
+The opened tiles are kept for reuse until their data exceed tileCacheBytes, then the least recently
+used ones are released, see getTile(..).
+"""
+
+import os, math, zipfile, gzip, struct, threading
+from collections import OrderedDict
+import numpy as np
+
+# ">i2" is a big-endian signed two byte integer
+hgtDtype = np.dtype(">i2")
+
+# the extensions of the tile files in the order of preference
+hgtExtensions = (".hgt", ".hgt.zip", ".hgt.gz")
+
+# the maximum size in bytes of the data of the opened tiles: the decompressed buffers and the memory mapped files
+tileCacheBytes = 512*1024*1024
+
+# the opened tiles from the least recently used one
+# the key is the absolute path of the tile file, the value is a tuple (file size, mtime, HgtTile or CompressedHgtTile)
+_tiles = OrderedDict()
+
+# guards _tiles, the tiles are opened by the reading threads of srtm.Srtm
+_tilesLock = threading.Lock()
+
+
+class HgtTile:
+        """
+        A .hgt file memory mapped read-only
+        Only the pages of the requested windows are actually read from the disk
+        """
+
+        def __init__(self, filepath, size):
+                self.filepath = filepath
+                self.size = size
+                self.samples = np.memmap(filepath, dtype=hgtDtype, mode="r", shape=(size+1, size+1))
+
+        def getBytes(self):
+                """
+                Returns the size in bytes of the data of the tile
+                """
+                return self.samples.nbytes
+
+        def getSamples(self, numRows):
+                """
+                Returns the array of all samples of the tile, at least the first numRows rows
+                (counted from the north) are guaranteed to be available
+                """
+                return self.samples
+
+        def window(self, y1, y2, x1, x2):
+                """
+                Returns a zero-copy view of the window y1..y2, x1..x2 (both inclusive)
+                y is counted from the southern edge of the tile, x is counted from the western edge
+                The rows of the view go from the north (y2) to the south (y1)
+                """
+                size = self.size
+                return self.getSamples(size-y1+1)[size-y2:size-y1+1, x1:x2+1]
+
+        def close(self):
+                pass
+
+
+class CompressedHgtTile(HgtTile):
+        """
+        A .hgt file inside a .zip archive or compressed with gzip
+        The samples are decompressed as a stream into a buffer; the rows are stored from the north,
+        so decompression stops at the southernmost row requested so far and resumes if more rows are needed
+        """
+
+        def __init__(self, filepath, size):
+                self.filepath = filepath
+                self.size = size
+                self.samples = np.empty((size+1, size+1), dtype=hgtDtype)
+                # the bytes of self.samples the stream is decompressed into
+                self.buffer = memoryview(self.samples.reshape(-1).view(np.uint8))
+                self.rowSize = 2*(size+1)
+                self.numBytes = 0
+                self.stream = None
+                self.archive = None
+                # reentrant, since close() is called by getSamples(..) and when the tile is released
+                self.lock = threading.RLock()
+
+        def getSamples(self, numRows):
+                numBytes = min(numRows, self.size+1) * self.rowSize
+                with self.lock:
+                        if self.numBytes < numBytes:
+                                if not self.stream:
+                                        self.open()
+                                while self.numBytes < numBytes:
+                                        n = self.stream.readinto(self.buffer[self.numBytes:numBytes])
+                                        if not n:
+                                                raise ValueError("%s is truncated" % self.filepath)
+                                        self.numBytes += n
+                                if self.numBytes == len(self.buffer):
+                                        self.close()
+                return self.samples
+
+        def open(self):
+                """
+                Opens the stream positioned after the self.numBytes bytes decompressed so far,
+                so a tile closed before it was decompressed completely resumes where it stopped
+                """
+                if self.filepath.lower().endswith(".zip"):
+                        self.archive = zipfile.ZipFile(self.filepath)
+                        self.stream = self.archive.open(getZipMember(self.archive, self.filepath))
+                else:
+                        self.stream = gzip.open(self.filepath, "rb")
+                skip = self.numBytes
+                while skip:
+                        n = len(self.stream.read(min(skip, 1<<20)))
+                        if not n:
+                                raise ValueError("%s is truncated" % self.filepath)
+                        skip -= n
+
+        def close(self):
+                with self.lock:
+                        if self.stream:
+                                self.stream.close()
+                                self.stream = None
+                        if self.archive:
+                                self.archive.close()
+                                self.archive = None
+
+
+def isCompressed(filepath):
+        return filepath.lower().endswith((".zip", ".gz"))
+
+
+def getZipMember(archive, filepath):
+        """
+        Returns the name of the .hgt file inside the .zip archive
+        """
+        for name in archive.namelist():
+                if name.lower().endswith(".hgt"):
+                        return name
+        raise ValueError("%s doesn't contain a .hgt file" % filepath)
+
+
+def getDataSize(filepath):
+        """
+        Returns the size of the .hgt data in bytes: the size of the file itself or
+        the uncompressed size for a .hgt.zip or .hgt.gz file
+        """
+        lowerPath = filepath.lower()
+        if lowerPath.endswith(".zip"):
+                with zipfile.ZipFile(filepath) as archive:
+                        return archive.getinfo(getZipMember(archive, filepath)).file_size
+        elif lowerPath.endswith(".gz"):
+                # the last four bytes of a gzip file hold the uncompressed size modulo 2^32
+                with open(filepath, "rb") as f:
+                        f.seek(-4, os.SEEK_END)
+                        return struct.unpack("<I", f.read(4))[0]
+        return os.path.getsize(filepath)
+
+
+def findTile(filepath):
+        """
+        Returns the path of an existing tile file for the .hgt file path trying all hgtExtensions
+        or None if there is no such file
+        """
+        base = filepath[:-4] if filepath.lower().endswith(".hgt") else filepath
+        for extension in hgtExtensions:
+                if os.path.isfile(base + extension):
+                        return base + extension
+        return None
+
+
+def getTileSize(filepath):
+        """
+        Returns the number of intervals between the samples of a tile row: 1200 for SRTM3, 3600 for SRTM1
+        The value is derived from the size of the .hgt data holding (size+1)x(size+1) samples
+        """
+        try:
+                dataSize = getDataSize(filepath)
+        except (zipfile.BadZipfile, IOError, OSError) as e:
+                raise ValueError("%s isn't a valid .hgt file: %s" % (filepath, e))
+        size = int(round(math.sqrt(dataSize/2))) - 1
+        if size < 1 or 2*(size+1)*(size+1) != dataSize:
+                raise ValueError("%s isn't a valid .hgt file: unexpected data size %s" % (filepath, dataSize))
+        return size
+
+
+def getTile(filepath, size):
+        """
+        Returns the memory mapped tile for the .hgt file or the decompressed tile for a .hgt.zip or .hgt.gz file
+        A tile opened before is reused unless the file has changed since then
+        If the data of the opened tiles exceed tileCacheBytes, the least recently used tiles are released;
+        a released tile stays valid for the callers still holding it
+        """
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        with _tilesLock:
+                entry = _tiles.get(filepath)
+                if entry and entry[0]==stat.st_size and entry[1]==stat.st_mtime and entry[2].size==size:
+                        _tiles.move_to_end(filepath)
+                        return entry[2]
+                if entry:
+                        del _tiles[filepath]
+                        entry[2].close()
+                tile = (CompressedHgtTile if isCompressed(filepath) else HgtTile)(filepath, size)
+                _tiles[filepath] = (stat.st_size, stat.st_mtime, tile)
+                # the new tile is kept even if it alone exceeds tileCacheBytes
+                numBytes = sum(entry[2].getBytes() for entry in _tiles.values())
+                while numBytes > tileCacheBytes and len(_tiles) > 1:
+                        entry = _tiles.popitem(last=False)[1]
+                        numBytes -= entry[2].getBytes()
+                        entry[2].close()
+        return tile
+
+
+def releaseTiles():
+        """
+        Closes all tiles and frees the buffers of the decompressed ones
+        """
+        with _tilesLock:
+                for entry in _tiles.values():
+                        entry[2].close()
+                _tiles.clear()
+
+
+def readWindow(filepath, size, y1, y2, x1, x2):
+        """
+        Returns a zero-copy view of the window y1..y2, x1..x2 (both inclusive) of the .hgt file
+        See HgtTile.window(..) for the details
+        """
+        return getTile(filepath, size).window(y1, y2, x1, x2)
+
+
+def decodeWindow(raw, voidValue, voidSubstitution):
+        """
+        Converts the raw samples returned by readWindow(..) to native heights
+        Void samples (voidValue) are replaced with voidSubstitution in a single masked operation
+        """
+        heights = raw.astype(np.int16)
+        heights[heights==voidValue] = voidSubstitution
+        return heights
+
+
+def resampleWindow(filepath, size, ys, xs, targetSize, voidValue, voidSubstitution):
+        """
+        Returns the heights of the tile with the native size at the posts of a tile with targetSize,
+        e.g. a SRTM3 tile (size 1200) at the posts of SRTM1 data (targetSize 3600)
+        ys and xs are arrays of the post indices at targetSize;
+        y is counted from the southern edge of the tile, x is counted from the western edge
+        The heights are interpolated bilinearly; a post gets voidSubstitution
+        if any sample contributing to it is a void
+        Returns a float32 array with the shape (len(ys), len(xs))
+        """
+        # the posts in the sample coordinates of the tile
+        fy = np.asarray(ys) * (size/targetSize)
+        fx = np.asarray(xs) * (size/targetSize)
+        y0 = np.minimum(np.floor(fy).astype(np.intp), size-1)
+        x0 = np.minimum(np.floor(fx).astype(np.intp), size-1)
+        samples = getTile(filepath, size).getSamples(size-y0.min()+1 if len(y0) else 0)
+        ty = (fy - y0)[:,None]
+        tx = fx - x0
+        heights = np.zeros((len(ys), len(xs)), dtype=np.float32)
+        voidWeight = np.zeros(heights.shape, dtype=np.float32)
+        # the rows of the file go from the north to the south
+        for (rows, wy) in ((size-y0, 1-ty), (size-y0-1, ty)):
+                for (cols, wx) in ((x0, 1-tx), (x0+1, tx)):
+                        z = samples[np.ix_(rows, cols)].astype(np.float32)
+                        weight = wy*wx
+                        void = z==voidValue
+                        z[void] = 0
+                        heights += weight*z
+                        voidWeight += weight*void
+        heights[voidWeight>0] = voidSubstitution
+        return heights
@@ -8,7 +8,7 @@ bl_info = {
         "version": (1, 0, 0),
         "blender": (2, 6, 9),
         "location": "File > Import > SRTM (.hgt)",
-        "description" : "Import digital elevation model data from files in grid format (.grid)",
+        "description" : "Import digital elevation model data from files in grid format (.grid), ESRI ASCII grids (.asc) and raw rasters (.flt, .bil)",
         "warning": "",
         "wiki_url": "https://github.com/vvoovv/blender-geo/wiki/Import-SRTM-(.hgt)",
         "tracker_url": "https://github.com/vvoovv/blender-geo/issues",
@@ -22,44 +22,16 @@ from bpy_extras.io_utils import ImportHelper
 
 import struct, math, os
 
-import sys
-import math
-
-# see conversion formulas at
-# http://en.wikipedia.org/wiki/Transverse_Mercator_projection
-# and
-# http://mathworld.wolfram.com/MercatorProjection.html
-class TransverseMercator:
-        radius = 6378137
-
-        def __init__(self, **kwargs):
-                # setting default values
-                self.lat = 0 # in degrees
-                self.lon = 0 # in degrees
-                self.k = 1 # scale factor
-                
-                for attr in kwargs:
-                        setattr(self, attr, kwargs[attr])
-                self.latInRadians = math.radians(self.lat)
+import numpy as np
 
-        def fromGeographic(self, lat, lon):
-                lat = math.radians(lat)
-                lon = math.radians(lon-self.lon)
-                B = math.sin(lon) * math.cos(lat)
-                x = 0.5 * self.k * self.radius * math.log((1+B)/(1-B))
-                y = self.k * self.radius * ( math.atan(math.tan(lat)/math.cos(lon)) - self.latInRadians )
-                return (x,y)
+from transverse_mercator import TransverseMercator, PlanarProjection
+from mesh_builder import createMesh, setCustomProperties
+from pt_array import PtArray, openGrid
+from footprint import parseSchedule
+from selection_extent import getObjectOutline
 
-        def toGeographic(self, x, y):
-                x = x/(self.k * self.radius)
-                y = y/(self.k * self.radius)
-                D = y + self.latInRadians
-                lon = math.atan(math.sinh(x)/math.cos(D))
-                lat = math.asin(math.sin(D)/math.cosh(x))
-
-                lon = self.lon + math.degrees(lon)
-                lat = math.degrees(lat)
-                return (lat, lon)
+import sys
+import math
 
 def getPtArrayIntervals(x1, x2):
         """
@@ -79,27 +51,8 @@ def getPtArrayIntervals(x1, x2):
                         _x1 = _x2
         return intervals
 
-def getSelectionBoundingBox(context):
-        # perform context.scene.update(), otherwise o.matrix_world or o.bound_box are incorrect
-        context.scene.update()
-        if len(context.selected_objects)==0:
-                return None
-        xmin = float("inf")
-        ymin = float("inf")
-        xmax = float("-inf")
-        ymax = float("-inf")
-        for o in context.selected_objects:
-                for v in o.bound_box:
-                        (x,y,z) = o.matrix_world * mathutils.Vector(v)
-                        if x<xmin: xmin = x
-                        elif x>xmax: xmax = x
-                        if y<ymin: ymin = y
-                        elif y>ymax: ymax = y
-        return {"xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax}
-
-
 class ImportPtArray(bpy.types.Operator, ImportHelper):
-        """Import digital elevation model data from files in grid format (.grid)"""
+        """Import digital elevation model data from files in grid format (.grid), ESRI ASCII grids (.asc) and raw rasters (.flt, .bil)"""
         bl_idname = "import_scene.grid"  # important since its how bpy.ops.import_scene.srtm is constructed
         bl_label = "Import grid"
         bl_options = {"UNDO","PRESET"}
@@ -108,7 +61,7 @@ class ImportPtArray(bpy.types.Operator, ImportHelper):
         filename_ext = ".grid"
 
         filter_glob = bpy.props.StringProperty(
-                default="*.grid",
+                default="*.grid;*.asc;*.flt;*.bil",
                 options={"HIDDEN"},
         )
 
@@ -119,12 +72,52 @@ class ImportPtArray(bpy.types.Operator, ImportHelper):
         )
         
         primitiveType = bpy.props.EnumProperty(
-                name="Mesh primitive type: quad or triangle",
-                items=(("quad","quad","quad"),("triangle","triangle","triangle")),
-                description="Primitive type used for the terrain mesh: quad or triangle",
+                name="Mesh primitive type: quad, triangle or adaptive",
+                items=(
+                        ("quad","quad","quad"),
+                        ("triangle","triangle","triangle"),
+                        ("rtin","adaptive","Right-triangulated irregular network keeping detail only where the terrain needs it")
+                ),
+                description="Primitive type used for the terrain mesh: quad, triangle or adaptive triangles",
                 default="quad",
         )
         
+        maxError = bpy.props.FloatProperty(
+                name="Max error",
+                description="Maximum vertical error of the adaptive triangulation in meters",
+                min=0,
+                default=1,
+        )
+        
+        resampleSpacing = bpy.props.FloatProperty(
+                name="Resample spacing",
+                description="Resample the grid onto square cells of this size in meters; 0 keeps the posts of the file",
+                min=0,
+                default=0,
+        )
+        
+        resampleMethod = bpy.props.EnumProperty(
+                name="Resample method",
+                items=(
+                        ("bilinear","bilinear","Bilinear interpolation"),
+                        ("bicubic","bicubic","Bicubic interpolation, smoother when upsampling")
+                ),
+                description="Interpolation of the heights for the resampled grid",
+                default="bilinear",
+        )
+        
+        centerlineObject = bpy.props.StringProperty(
+                name="Centerline",
+                description="Curve or mesh object (e.g. the racing line); the mesh gets coarser with the distance from it",
+                default="",
+        )
+        
+        gradingSchedule = bpy.props.StringProperty(
+                name="Distance schedule",
+                description="distance:spacing pairs; starting from the distance in meters every Nth post is used",
+                default="0:1, 500:4, 2000:16",
+        )
+        
         useSpecificExtent = bpy.props.BoolProperty(
                 name="Use manually set extent",
                 description="Use specific extent by setting min lat, max lat, min lon, max lon",
@@ -157,110 +150,113 @@ class ImportPtArray(bpy.types.Operator, ImportHelper):
 
         def execute(self, context):
                 scene = context.scene
-                projection = None
-                if "latitude" in scene and "longitude" in scene:
-                        projection = TransverseMercator(lat=scene["latitude"], lon=scene["longitude"])
-
-                # remember if we have georeferencing
-                _projection = projection
-                with open (self.filepath) as f:
-                        line = f.readline ()
-                        (snx, sny, sincx, sincy, sminlon, sminlat) = line.split(" ");
-                        nx = int (snx);
-                        ny = int (sny);
-                        incx = float (sincx);
-                        incy = float (sincy);
-                        minlon = float (sminlon);
-                        minlat = float (sminlat);
+                try:
+                        (f, (nx, ny, incx, incy, minlon, minlat), gridLayout) = openGrid(self.filepath)
+                except ValueError as e:
+                        self.report({"ERROR"}, str(e))
+                        return {"FINISHED"}
+                with f:
                         maxlon = minlon + incx * nx;
                         maxlat = minlat + incy * ny;
+                        # a raster with projected coordinates has its own georeferencing: the origin x, y in meters
+                        geographic = gridLayout.get("geographic", True)
+                        projection = None
+                        if geographic:
+                                if "latitude" in scene and "longitude" in scene:
+                                        projection = TransverseMercator(lat=scene["latitude"], lon=scene["longitude"])
+                        elif "projectedX" in scene and "projectedY" in scene:
+                                projection = PlanarProjection(x=scene["projectedX"], y=scene["projectedY"])
+
+                        centerline = gradingSchedule = None
+                        if projection:
+                                try:
+                                        (centerline, gradingSchedule) = self.getCenterline(context)
+                                except ValueError as e:
+                                        self.report({"ERROR"}, str(e))
+                                        return {"FINISHED"}
+
+                        # remember if we have georeferencing
+                        _projection = projection
                         if not projection:
-                                projection = TransverseMercator(lat=(minlat+maxlat)/2, lon=(minlon+maxlon)/2)
+                                projection = TransverseMercator(lat=(minlat+maxlat)/2, lon=(minlon+maxlon)/2) if geographic \
+                                        else PlanarProjection(x=(minlon+maxlon)/2, y=(minlat+maxlat)/2)
                         srtm = PtArray(
                                 nx=nx, ny=ny,
+                                incx=incx, incy=incy,
+                                minlon=minlon, minlat=minlat,
                                 projection=projection,
                                 f=f,
-                                primitiveType = self.primitiveType)
-                        verts = []
-                        indices = []
-                        srtm.build(verts, indices)
+                                layout=gridLayout,
+                                primitiveType = self.primitiveType,
+                                maxError = self.maxError,
+                                resampleSpacing = self.resampleSpacing,
+                                resampleMethod = self.resampleMethod,
+                                centerline = centerline,
+                                gradingSchedule = gradingSchedule)
+                        try:
+                                (verts, indices, stats) = srtm.build()
+                        except ValueError as e:
+                                self.report({"ERROR"}, str(e))
+                                return {"FINISHED"}
 
                         # create a mesh object in Blender
-                        mesh = bpy.data.meshes.new("PtArry")
-                        mesh.from_pydata(verts, [], indices)
-                        mesh.update()
+                        mesh = createMesh("PtArry", verts, indices)
                         obj = bpy.data.objects.new("PtArray", mesh)
+                        # the height statistics for material setup, drop tools and export
+                        setCustomProperties(obj, stats)
                         bpy.context.scene.objects.link(obj)
-                # set custom parameter "latitude" and "longitude" to the active scene
+                # set custom parameter "latitude" and "longitude" (or "projectedX" and "projectedY") to the active scene
                 if not _projection:
-                        scene["latitude"] = projection.lat
-                        scene["longitude"] = projection.lon
+                        if geographic:
+                                scene["latitude"] = projection.lat
+                                scene["longitude"] = projection.lon
+                        else:
+                                scene["projectedX"] = projection.x
+                                scene["projectedY"] = projection.y
                 
                 return {"FINISHED"}
 
+        def getCenterline(self, context):
+                """
+                Returns the tuple (centerline, gradingSchedule) for the engine or (None, None) if no centerline is set
+                Raises ValueError if the centerline object or the schedule is invalid
+                """
+                if not self.centerlineObject:
+                        return (None, None)
+                obj = context.scene.objects.get(self.centerlineObject)
+                if not obj or obj.type not in ("CURVE", "MESH"):
+                        raise ValueError("The centerline must be a curve or mesh object")
+                centerline = getObjectOutline(obj, context.scene)[0]
+                if not len(centerline):
+                        raise ValueError("The centerline object has no edges")
+                return (centerline, parseSchedule(self.gradingSchedule))
+
         def draw(self, context):
                 layout = self.layout
 
                 layout.label("Mesh primitive type:")
                 row = layout.row()
                 row.prop(self, "primitiveType", expand=True)
-        
+                if self.primitiveType == "rtin":
+                        layout.prop(self, "maxError")
                 
-
-class PtArray:
-
-        # SRTM3 data are sampled at three arc-seconds and contain 1201 lines and 1201 samples
-        size = 3600
-
-        voidValue = -32768
-
-        def __init__(self, **kwargs):
-                self.srtmDir = "."
-                self.voidSubstitution = 0
-                
-                for key in kwargs:
-                        setattr(self, key, kwargs[key])
+                layout.prop(self, "resampleSpacing")
+                if self.resampleSpacing:
+                        row = layout.row()
+                        row.prop(self, "resampleMethod", expand=True)
                 
-        def build(self, verts, indices):
-                """
-                The method fills verts and indices lists with values
-                verts is a list of vertices
-                indices is a list of tuples; each tuple is composed of 3 indices of verts that define a triangle
-                """
-                
-                minHeight = 32767
-                maxHeight = -32767
-                maxLon = 0
-                maxLat = 0
-                
-                vertsCounter = 0
-                
-                for y in range(0, self.ny):
-                        for x in range(0, self.nx):
-                                line = self.f.readline ()
-                                (slat, slon, alt) = line.split (" ")
-                                lat = float (slat)
-                                lon = float (slon)
-                                z = float (alt)
-                                xy = self.projection.fromGeographic(lat, lon)
-                                # print ("%d: %f %f height %f" % (vertsCounter, xy[0], xy[1], z))
-                                # add a new vertex to the verts array
-                                verts.append((xy[0], xy[1], z))
-                                if x>0 and y>0:
-                                        topNeighborIndex = vertsCounter-self.nx
-                                        leftTopNeighborIndex = vertsCounter-self.nx-1
-                                        if self.primitiveType == "quad":
-                                                # print ("%d %d %d %d" % (vertsCounter, topNeighborIndex, leftTopNeighborIndex, vertsCounter-1))
-                                                indices.append((vertsCounter, topNeighborIndex, leftTopNeighborIndex, vertsCounter-1))
-                                        else: # self.primitiveType == "triangle"
-                                                indices.append((vertsCounter-1, topNeighborIndex, leftTopNeighborIndex))
-                                                indices.append((vertsCounter, topNeighborIndex, vertsCounter-1))
-                                vertsCounter += 1
+                row = layout.row()
+                if not ("latitude" in context.scene and "longitude" in context.scene or
+                                "projectedX" in context.scene and "projectedY" in context.scene):
+                        row.enabled = False
+                row.prop_search(self, "centerlineObject", context.scene, "objects")
+                if self.centerlineObject:
+                        layout.prop(self, "gradingSchedule")
 
 
 # Only needed if you want to add into a dynamic menu
 def menu_func_import(self, context):
-        self.layout.operator(ImportPtArray.bl_idname, text="Grid (.grid)")
+        self.layout.operator(ImportPtArray.bl_idname, text="Grid (.grid, .asc, .flt, .bil)")
 
 def register():
         bpy.utils.register_class(ImportPtArray)
@@ -22,44 +22,13 @@ from bpy_extras.io_utils import ImportHelper
 
 import struct, math, os
 
-import sys
-import math
+import numpy as np
 
-# see conversion formulas at
-# http://en.wikipedia.org/wiki/Transverse_Mercator_projection
-# and
-# http://mathworld.wolfram.com/MercatorProjection.html
-class TransverseMercator:
-        radius = 6378137
+from transverse_mercator import TransverseMercator
+from mesh_builder import createMesh
 
-        def __init__(self, **kwargs):
-                # setting default values
-                self.lat = 0 # in degrees
-                self.lon = 0 # in degrees
-                self.k = 1 # scale factor
-                
-                for attr in kwargs:
-                        setattr(self, attr, kwargs[attr])
-                self.latInRadians = math.radians(self.lat)
-
-        def fromGeographic(self, lat, lon):
-                lat = math.radians(lat)
-                lon = math.radians(lon-self.lon)
-                B = math.sin(lon) * math.cos(lat)
-                x = 0.5 * self.k * self.radius * math.log((1+B)/(1-B))
-                y = self.k * self.radius * ( math.atan(math.tan(lat)/math.cos(lon)) - self.latInRadians )
-                return (x,y)
-
-        def toGeographic(self, x, y):
-                x = x/(self.k * self.radius)
-                y = y/(self.k * self.radius)
-                D = y + self.latInRadians
-                lon = math.atan(math.sinh(x)/math.cos(D))
-                lat = math.asin(math.sin(D)/math.cosh(x))
-
-                lon = self.lon + math.degrees(lon)
-                lat = math.degrees(lat)
-                return (lat, lon)
+import sys
+import math
 
 def getPtPathIntervals(x1, x2):
         """
@@ -79,25 +48,6 @@ def getPtPathIntervals(x1, x2):
                         _x1 = _x2
         return intervals
 
-def getSelectionBoundingBox(context):
-        # perform context.scene.update(), otherwise o.matrix_world or o.bound_box are incorrect
-        context.scene.update()
-        if len(context.selected_objects)==0:
-                return None
-        xmin = float("inf")
-        ymin = float("inf")
-        xmax = float("-inf")
-        ymax = float("-inf")
-        for o in context.selected_objects:
-                for v in o.bound_box:
-                        (x,y,z) = o.matrix_world * mathutils.Vector(v)
-                        if x<xmin: xmin = x
-                        elif x>xmax: xmax = x
-                        if y<ymin: ymin = y
-                        elif y>ymax: ymax = y
-        return {"xmin": xmin, "ymin": ymin, "xmax": xmax, "ymax": ymax}
-
-
 class ImportPtPath(bpy.types.Operator, ImportHelper):
         """Import digital elevation model data from files in path format (.path)"""
         bl_idname = "import_scene.path"  # important since its how bpy.ops.import_scene.srtm is constructed
@@ -165,14 +115,10 @@ class ImportPtPath(bpy.types.Operator, ImportHelper):
                 _projection = projection
                 with open (self.filepath) as f:
                         srtm = PtPath(projection=projection, f=f)
-                        verts = []
-                        indices = []
-                        srtm.build(verts, indices)
+                        (verts, indices) = srtm.build()
 
                         # create a mesh object in Blender
-                        mesh = bpy.data.meshes.new("PtArry")
-                        mesh.from_pydata(verts, indices, [])
-                        mesh.update()
+                        mesh = createMesh("PtArry", verts, edges=indices)
                         obj = bpy.data.objects.new("PtPath", mesh)
                         bpy.context.scene.objects.link(obj)
 
@@ -201,32 +147,29 @@ class PtPath:
                 for key in kwargs:
                         setattr(self, key, kwargs[key])
                 
-        def build(self, verts, indices):
+        def build(self):
                 """
-                The method fills verts and indices lists with values
-                verts is a list of vertices
-                indices is a list of tuples; each tuple is composed of 3 indices of verts that define a triangle
+                Reads the points of the path from self.f
+                Returns the tuple (verts, indices)
+                verts is an array of vertices with the shape (n, 3)
+                indices is an array of edges connecting the consecutive vertices
                 """
                 
-                minHeight = 32767
-                maxHeight = -32767
-                maxLon = 0
-                maxLat = 0
-                
-                vertsCounter = 0
-                
+                # read all points first to project them with a single call
+                lats = []
+                lons = []
+                heights = []
                 for line in self.f:
                         (slat, slon, alt) = line.split (" ")
-                        lat = float (slat)
-                        lon = float (slon)
-                        z = float (alt)
-                        xy = self.projection.fromGeographic(lat, lon)
-                        print ("%d: %f %f height %f" % (vertsCounter, xy[0], xy[1], z))
-                        # add a new vertex to the verts array
-                        verts.append((xy[0], xy[1], z))
-                        if vertsCounter>0:
-                                indices.append((vertsCounter, vertsCounter-1))
-                        vertsCounter += 1
+                        lats.append(float (slat))
+                        lons.append(float (slon))
+                        heights.append(float (alt))
+                (xs, ys) = self.projection.fromGeographicArray(np.array(lats), np.array(lons))
+                verts = np.column_stack((xs, ys, heights))
+                
+                # each vertex except the first one is connected to the previous one
+                index = np.arange(1, len(heights), dtype=np.int32)
+                return (verts, np.column_stack((index, index-1)))
 
 
 # Only needed if you want to add into a dynamic menu
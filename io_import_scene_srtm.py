@@ -0,0 +1,478 @@
+# This is the release version of the plugin file io_import_scene_srtm_dev.py
+# If you would like to make edits, make them in the file io_import_scene_srtm_dev.py and the other related modules
+# To create the release version of io_import_scene_srtm_dev.py, executed:
+# python plugin_builder.py io_import_scene_srtm_dev.py:
+bl_info = {
+        "name": "Import SRTM (.hgt)",
+        "author": "Vladimir Elistratov <vladimir.elistratov@gmail.com>",
+        "version": (1, 0, 0),
+        "blender": (2, 6, 9),
+        "location": "File > Import > SRTM (.hgt)",
+        "description" : "Import digital elevation model data from files in the SRTM1 or SRTM3 format (.hgt)",
+        "warning": "",
+        "wiki_url": "https://github.com/vvoovv/blender-geo/wiki/Import-SRTM-(.hgt)",
+        "tracker_url": "https://github.com/vvoovv/blender-geo/issues",
+        "support": "COMMUNITY",
+        "category": "Import-Export",
+}
+
+import bpy, mathutils
+# ImportHelper is a helper class, defines filename and invoke() function which calls the file selector
+from bpy_extras.io_utils import ImportHelper
+
+import struct, math, os
+
+import numpy as np
+
+from transverse_mercator import TransverseMercator
+from mesh_builder import createMesh, addVertexGroup, setCustomProperties
+from srtm import Srtm
+from hgt_tiles import releaseTiles
+from terrain_cache import TerrainCache
+from tile_index import TileIndex
+from selection_extent import getSelectionBoundingBox, getObjectOutline
+from footprint import Footprint, parseSchedule
+
+import sys
+import math
+
+def getTileIndex(tileDirs):
+        """
+        Returns the tile index for the directories separated by ; or None if there are no directories
+        """
+        roots = [bpy.path.abspath(d.strip()) for d in tileDirs.split(";") if d.strip()]
+        return TileIndex(roots) if roots else None
+
+
+class ImportSrtm(bpy.types.Operator, ImportHelper):
+        """Import digital elevation model data from files in the SRTM1 or SRTM3 format (.hgt, .hgt.zip, .hgt.gz)"""
+        bl_idname = "import_scene.srtm"  # important since its how bpy.ops.import_scene.srtm is constructed
+        bl_label = "Import SRTM"
+        bl_options = {"UNDO","PRESET"}
+
+        # ImportHelper mixin class uses this
+        filename_ext = ".hgt"
+
+        filter_glob = bpy.props.StringProperty(
+                default="*.hgt;*.hgt.zip;*.hgt.gz",
+                options={"HIDDEN"},
+        )
+
+        ignoreGeoreferencing = bpy.props.BoolProperty(
+                name="Ignore existing georeferencing",
+                description="Ignore existing georeferencing and make a new one",
+                default=False,
+        )
+        
+        useSelectionAsExtent = bpy.props.BoolProperty(
+                name="Use selected objects as extent",
+                description="Use selected objects as extent",
+                default=False,
+        )
+        
+        extentMargin = bpy.props.FloatProperty(
+                name="Margin",
+                description="Extend the extent of the selected objects by this distance in meters on each side",
+                min=0,
+                default=0,
+        )
+        
+        tileDirs = bpy.props.StringProperty(
+                name="Tile library",
+                description="Directories with SRTM tiles separated by ;, they are searched with their subdirectories before the directory of the selected file",
+                default="",
+        )
+        
+        resolution = bpy.props.EnumProperty(
+                name="Target resolution: auto, SRTM1 or SRTM3",
+                items=(
+                        ("auto","auto","Use the resolution of the finest tile of the extent"),
+                        ("3600","SRTM1","One arc-second, tiles of SRTM3 data are resampled"),
+                        ("1200","SRTM3","Three arc-seconds, tiles of SRTM1 data are resampled")
+                ),
+                description="Post spacing of the terrain mesh; tiles of a different resolution are resampled to it",
+                default="auto",
+        )
+        
+        primitiveType = bpy.props.EnumProperty(
+                name="Mesh primitive type: quad, triangle or adaptive",
+                items=(
+                        ("quad","quad","quad"),
+                        ("triangle","triangle","triangle"),
+                        ("rtin","adaptive","Right-triangulated irregular network keeping detail only where the terrain needs it")
+                ),
+                description="Primitive type used for the terrain mesh: quad, triangle or adaptive triangles",
+                default="quad",
+        )
+        
+        maxError = bpy.props.FloatProperty(
+                name="Max error",
+                description="Maximum vertical error of the adaptive triangulation in meters",
+                min=0,
+                default=1,
+        )
+        
+        decimation = bpy.props.EnumProperty(
+                name="Resolution",
+                items=(
+                        ("native","native","Import every post of the SRTM data"),
+                        ("stride","stride","Import every Nth post"),
+                        ("budget","vertex budget","Choose the stride to keep the number of vertices within the budget")
+                ),
+                description="Resolution of the terrain mesh",
+                default="native",
+        )
+        
+        stride = bpy.props.IntProperty(
+                name="Stride",
+                description="Import every Nth post in both directions",
+                min=1,
+                default=2,
+        )
+        
+        vertexBudget = bpy.props.IntProperty(
+                name="Vertex budget",
+                description="The maximum number of vertices of the terrain mesh",
+                min=4,
+                default=1000000,
+        )
+        
+        decimationMethod = bpy.props.EnumProperty(
+                name="Decimation method: sample or average",
+                items=(("sample","sample","Take every Nth post"),("average","average","Average the blocks of NxN posts")),
+                description="How the posts are decimated: sampled or averaged",
+                default="sample",
+        )
+        
+        fillVoids = bpy.props.BoolProperty(
+                name="Fill voids",
+                description="Interpolate the voids of the SRTM data from the terrain around them instead of setting them to zero height; the filled vertices are put into the vertex group \"void_filled\"",
+                default=False,
+        )
+        
+        useChunks = bpy.props.BoolProperty(
+                name="Import in chunks",
+                description="Split the terrain into separate mesh objects of limited size, decoding one chunk at a time; with \"Fill voids\" the whole terrain is decoded once to fill the voids, so the memory isn't bounded by the chunk size then",
+                default=False,
+        )
+        
+        chunkSize = bpy.props.IntProperty(
+                name="Chunk size",
+                description="The number of posts along each side of a chunk",
+                min=2,
+                default=512,
+        )
+        
+        useCache = bpy.props.BoolProperty(
+                name="Use terrain cache",
+                description="Keep the decoded and projected terrain on disk, so importing the same area again is a single load",
+                default=False,
+        )
+        
+        cacheDir = bpy.props.StringProperty(
+                name="Cache directory",
+                description="Directory for the terrain cache; the system temporary directory is used if empty",
+                subtype="DIR_PATH",
+                default="",
+        )
+        
+        cacheSizeLimit = bpy.props.IntProperty(
+                name="Cache size limit (MB)",
+                description="The least recently used entries are removed when the cache grows beyond this size",
+                min=1,
+                default=2048,
+        )
+        
+        maskObject = bpy.props.StringProperty(
+                name="Mask",
+                description="Import only the terrain around this curve or mesh object (e.g. a track outline); its buffered bounds are the extent unless the selected objects or the manually set extent give one",
+                default="",
+        )
+        
+        maskBuffer = bpy.props.FloatProperty(
+                name="Buffer",
+                description="Distance in meters from the edges of the mask object within which the terrain is imported",
+                min=0,
+                default=300,
+        )
+        
+        centerlineObject = bpy.props.StringProperty(
+                name="Centerline",
+                description="Curve or mesh object (e.g. the racing line); the mesh gets coarser with the distance from it",
+                default="",
+        )
+        
+        gradingSchedule = bpy.props.StringProperty(
+                name="Distance schedule",
+                description="distance:spacing pairs; starting from the distance in meters every Nth post is used",
+                default="0:1, 500:4, 2000:16",
+        )
+        
+        useSpecificExtent = bpy.props.BoolProperty(
+                name="Use manually set extent",
+                description="Use specific extent by setting min lat, max lat, min lon, max lon; it takes precedence over the extent of the mask, the mask still trims the terrain within it",
+                default=False,
+        )
+        
+        minLat = bpy.props.FloatProperty(
+                name="min lat",
+                description="Minimum latitude of the imported extent",
+                default=0,
+        )
+
+        maxLat = bpy.props.FloatProperty(
+                name="max lat",
+                description="Maximum latitude of the imported extent",
+                default=0,
+        )
+
+        minLon = bpy.props.FloatProperty(
+                name="min lon",
+                description="Minimum longitude of the imported extent",
+                default=0,
+        )
+
+        maxLon = bpy.props.FloatProperty(
+                name="max lon",
+                description="Maximum longitude of the imported extent",
+                default=0,
+        )
+
+        def execute(self, context):
+                scene = context.scene
+                projection = None
+                if "latitude" in scene and "longitude" in scene and not self.ignoreGeoreferencing:
+                        projection = TransverseMercator(lat=scene["latitude"], lon=scene["longitude"])
+                footprint = None
+                if self.maskObject and projection:
+                        maskObject = scene.objects.get(self.maskObject)
+                        if not maskObject or maskObject.type not in ("CURVE", "MESH"):
+                                self.report({"ERROR"}, "The mask must be a curve or mesh object")
+                                return {"FINISHED"}
+                        (segments, boundary) = getObjectOutline(maskObject, scene)
+                        if not len(segments):
+                                self.report({"ERROR"}, "The mask object has no edges")
+                                return {"FINISHED"}
+                        footprint = Footprint(segments, boundary, self.maskBuffer)
+                centerline = gradingSchedule = None
+                if projection:
+                        try:
+                                (centerline, gradingSchedule) = self.getCenterline(context)
+                        except ValueError as e:
+                                self.report({"ERROR"}, str(e))
+                                return {"FINISHED"}
+                if self.useSelectionAsExtent:
+                        bbox = getSelectionBoundingBox(context, self.extentMargin)
+                        if not bbox or bbox["xmin"]>=bbox["xmax"] or bbox["ymin"]>=bbox["ymax"]:
+                                self.report({"ERROR"}, "No objects are selected or extent of the selected objects is incorrect")
+                                return {"FINISHED"}
+                        # convert bbox to geographical coordinates
+                        (minLat, minLon) = projection.toGeographic(bbox["xmin"], bbox["ymin"])
+                        (maxLat, maxLon) = projection.toGeographic(bbox["xmax"], bbox["ymax"])
+                elif self.useSpecificExtent:
+                        # the explicit extent takes precedence over the extent of the mask
+                        minLat = self.minLat
+                        maxLat = self.maxLat
+                        minLon = self.minLon
+                        maxLon = self.maxLon
+                elif footprint:
+                        # the extent of the buffered footprint
+                        (xmin, ymin, xmax, ymax) = footprint.getBounds()
+                        (lats, lons) = projection.toGeographicArray(
+                                np.array((xmin, xmin, xmax, xmax)), np.array((ymin, ymax, ymin, ymax))
+                        )
+                        (minLat, maxLat, minLon, maxLon) = (lats.min(), lats.max(), lons.min(), lons.max())
+                else:
+                        # use extent of the self.filepath (a single .hgt file)
+                        srtmFileName = os.path.basename(self.filepath)
+                        if not srtmFileName:
+                                self.report({"ERROR"}, "A .hgt file with SRTM data wasn't specified")
+                                return {"FINISHED"}
+                        minLat = int(srtmFileName[1:3])
+                        if srtmFileName[0]=="S":
+                                minLat = -minLat
+                        maxLat = minLat + 1
+                        minLon = int(srtmFileName[4:7])
+                        if srtmFileName[3]=="W":
+                                minLon = -minLon
+                        maxLon = minLon + 1
+                
+                # remember if we have georeferencing
+                _projection = projection
+                if not projection:
+                        projection = TransverseMercator(lat=(minLat+maxLat)/2, lon=(minLon+maxLon)/2)
+                srtm = Srtm(
+                        minLat=minLat,
+                        maxLat=maxLat,
+                        minLon=minLon,
+                        maxLon=maxLon,
+                        projection=projection,
+                        srtmDir=os.path.dirname(self.filepath), # directory for the .hgt files
+                        tileIndex = getTileIndex(self.tileDirs),
+                        footprint = footprint,
+                        centerline = centerline,
+                        gradingSchedule = gradingSchedule,
+                        size = None if self.resolution=="auto" else int(self.resolution),
+                        primitiveType = self.primitiveType,
+                        maxError = self.maxError,
+                        stride = self.stride if self.decimation=="stride" else 1,
+                        vertexBudget = self.vertexBudget if self.decimation=="budget" else 0,
+                        decimationMethod = self.decimationMethod,
+                        fillVoids = self.fillVoids,
+                        cache = TerrainCache(bpy.path.abspath(self.cacheDir), self.cacheSizeLimit*1024*1024) if self.useCache else None
+                )
+                missingSrtmFiles = srtm.getMissingSrtmFiles()
+                if missingSrtmFiles:
+                        for missingFile in missingSrtmFiles:
+                                self.report({"ERROR"}, "SRTM file %s is missing" % missingFile)
+                        return {"FINISHED"}
+                try:
+                        srtm.detectSize()
+                except ValueError as e:
+                        self.report({"ERROR"}, str(e))
+                        return {"FINISHED"}
+                # SRTM1 or SRTM3
+                name = "SRTM%d" % (3600//srtm.size)
+                if self.useChunks:
+                        for (i, j, verts, indices, filled, stats) in srtm.buildChunks(self.chunkSize):
+                                # create a mesh object in Blender for each chunk
+                                mesh = createMesh("%s_%d_%d" % (name, i, j), verts, indices)
+                                obj = bpy.data.objects.new(mesh.name, mesh)
+                                addVertexGroup(obj, "void_filled", filled)
+                                # the height statistics of the chunk
+                                setCustomProperties(obj, stats)
+                                bpy.context.scene.objects.link(obj)
+                                # free the buffers of the chunk before the next one is decoded
+                                del verts, indices, filled
+                else:
+                        (verts, indices, filled, stats) = srtm.build()
+                        
+                        # create a mesh object in Blender
+                        mesh = createMesh(name, verts, indices)
+                        obj = bpy.data.objects.new(name, mesh)
+                        addVertexGroup(obj, "void_filled", filled)
+                        # the height statistics for material setup, drop tools and export
+                        setCustomProperties(obj, stats)
+                        bpy.context.scene.objects.link(obj)
+                # set custom parameter "latitude" and "longitude" to the active scene
+                if not _projection:
+                        scene["latitude"] = projection.lat
+                        scene["longitude"] = projection.lon
+                
+                return {"FINISHED"}
+
+        def getCenterline(self, context):
+                """
+                Returns the tuple (centerline, gradingSchedule) for the engine or (None, None) if no centerline is set
+                Raises ValueError if the centerline object or the schedule is invalid
+                """
+                if not self.centerlineObject:
+                        return (None, None)
+                obj = context.scene.objects.get(self.centerlineObject)
+                if not obj or obj.type not in ("CURVE", "MESH"):
+                        raise ValueError("The centerline must be a curve or mesh object")
+                centerline = getObjectOutline(obj, context.scene)[0]
+                if not len(centerline):
+                        raise ValueError("The centerline object has no edges")
+                return (centerline, parseSchedule(self.gradingSchedule))
+
+        def draw(self, context):
+                layout = self.layout
+                
+                row = layout.row()
+                if self.useSelectionAsExtent: row.enabled = False
+                row.prop(self, "ignoreGeoreferencing")
+                
+                row = layout.row()
+                if self.useSpecificExtent or self.ignoreGeoreferencing or not ("latitude" in context.scene and "longitude" in context.scene):
+                        row.enabled = False
+                row.prop(self, "useSelectionAsExtent")
+                if self.useSelectionAsExtent:
+                        layout.prop(self, "extentMargin")
+                
+                layout.prop(self, "tileDirs")
+                
+                layout.label("Target resolution:")
+                row = layout.row()
+                row.prop(self, "resolution", expand=True)
+                
+                layout.label("Mesh primitive type:")
+                row = layout.row()
+                row.prop(self, "primitiveType", expand=True)
+                if self.primitiveType == "rtin":
+                        layout.prop(self, "maxError")
+                
+                layout.label("Resolution:")
+                row = layout.row()
+                row.prop(self, "decimation", expand=True)
+                if self.decimation == "stride":
+                        layout.prop(self, "stride")
+                elif self.decimation == "budget":
+                        layout.prop(self, "vertexBudget")
+                if self.decimation != "native":
+                        row = layout.row()
+                        row.prop(self, "decimationMethod", expand=True)
+                
+                layout.prop(self, "fillVoids")
+                
+                layout.prop(self, "useCache")
+                if self.useCache:
+                        box = layout.box()
+                        box.prop(self, "cacheDir")
+                        box.prop(self, "cacheSizeLimit")
+                
+                layout.prop(self, "useChunks")
+                if self.useChunks:
+                        layout.prop(self, "chunkSize")
+                
+                row = layout.row()
+                if self.ignoreGeoreferencing or not ("latitude" in context.scene and "longitude" in context.scene):
+                        row.enabled = False
+                row.prop_search(self, "maskObject", context.scene, "objects")
+                if self.maskObject:
+                        layout.prop(self, "maskBuffer")
+                
+                row = layout.row()
+                if self.ignoreGeoreferencing or not ("latitude" in context.scene and "longitude" in context.scene):
+                        row.enabled = False
+                row.prop_search(self, "centerlineObject", context.scene, "objects")
+                if self.centerlineObject:
+                        layout.prop(self, "gradingSchedule")
+                
+                row = layout.row()
+                if self.useSelectionAsExtent: row.enabled = False
+                row.prop(self, "useSpecificExtent")
+                
+                if self.useSpecificExtent:
+                        box = layout.box()
+                        box.prop(self, "maxLat")
+                        row = box.row()
+                        row.prop(self, "minLon")
+                        row.prop(self, "maxLon")
+                        box.prop(self, "minLat")
+
+class ImportSrtm3(ImportSrtm):
+        """Import SRTM3 data (.hgt, .hgt.zip, .hgt.gz) at three arc-seconds"""
+        # the operator of the former SRTM3 importer, kept for the scripts, keymaps and presets calling it
+        bl_idname = "import_scene.srtm3"
+        bl_label = "Import SRTM3"
+
+        def execute(self, context):
+                self.resolution = "1200"
+                return ImportSrtm.execute(self, context)
+
+
+# Only needed if you want to add into a dynamic menu
+def menu_func_import(self, context):
+        self.layout.operator(ImportSrtm.bl_idname, text="SRTM (.hgt)")
+
+def register():
+        bpy.utils.register_class(ImportSrtm)
+        bpy.utils.register_class(ImportSrtm3)
+        bpy.types.INFO_MT_file_import.append(menu_func_import)
+
+def unregister():
+        bpy.utils.unregister_class(ImportSrtm3)
+        bpy.utils.unregister_class(ImportSrtm)
+        bpy.types.INFO_MT_file_import.remove(menu_func_import)
+        releaseTiles()
@@ -0,0 +1,61 @@
+"""
+Creation of Blender meshes from NumPy arrays
+
+Vertex coordinates and vertex indices are written to the mesh with foreach_set(..),
+so no Python lists of tuples are needed as for mesh.from_pydata(..)
+"""
+
+import bpy
+import numpy as np
+
+# the face index arrays are built by mesh_topology, they are imported here for the convenience of the importers
+from mesh_topology import gridFaces, removeUnusedVertices
+
+
+def createMesh(name, verts, faces=None, edges=None):
+        """
+        Creates a new mesh datablock
+        verts is an array of vertex coordinates with the shape (n, 3) or a flat array of 3*n values
+        faces is an array of vertex indices with the shape (m, k), i.e. all faces have k vertices;
+        k is 4 for quads and 3 for triangles
+        edges is an array of vertex indices with the shape (m, 2)
+        """
+        verts = np.ascontiguousarray(verts, dtype=np.float32).reshape(-1)
+        mesh = bpy.data.meshes.new(name)
+        mesh.vertices.add(len(verts)//3)
+        mesh.vertices.foreach_set("co", verts)
+        if edges is not None and len(edges):
+                edges = np.ascontiguousarray(edges, dtype=np.int32)
+                mesh.edges.add(len(edges))
+                mesh.edges.foreach_set("vertices", edges.reshape(-1))
+        if faces is not None and len(faces):
+                faces = np.ascontiguousarray(faces, dtype=np.int32)
+                (numFaces, faceSize) = faces.shape
+                mesh.loops.add(numFaces*faceSize)
+                mesh.loops.foreach_set("vertex_index", faces.reshape(-1))
+                mesh.polygons.add(numFaces)
+                mesh.polygons.foreach_set("loop_start", np.arange(0, numFaces*faceSize, faceSize, dtype=np.int32))
+                mesh.polygons.foreach_set("loop_total", np.full(numFaces, faceSize, dtype=np.int32))
+        mesh.update(calc_edges=True)
+        return mesh
+
+
+def addVertexGroup(obj, name, indices, weight=1.0):
+        """
+        Adds the vertex group to the object and assigns the vertices with the given indices to it
+        Returns the vertex group or None if indices is empty
+        """
+        if not len(indices):
+                return None
+        group = obj.vertex_groups.new(name)
+        group.add(np.asarray(indices).tolist(), weight, "REPLACE")
+        return group
+
+
+def setCustomProperties(obj, properties):
+        """
+        Sets the custom properties of the Blender datablock from the dictionary
+        NumPy scalars and arrays are converted to Python numbers and lists
+        """
+        for name in properties:
+                obj[name] = np.asarray(properties[name]).tolist()
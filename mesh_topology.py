@@ -0,0 +1,40 @@
+"""
+Face and vertex index arrays of terrain meshes
+
+The module doesn't depend on Blender, so the meshes can be prepared outside of it,
+e.g. in the worker processes of batch_import.py
+"""
+
+import numpy as np
+
+
+def gridFaces(rows, cols, primitiveType="quad"):
+        """
+        Returns the faces for a regular grid of rows x cols vertices stored row by row
+        For the vertex v with the row and column indices above 0 the quad is
+        (v, top neighbor, left top neighbor, left neighbor);
+        primitiveType "triangle" splits each quad into two triangles
+        """
+        # the index of the vertex v for each quad
+        v = np.arange(cols, rows*cols, dtype=np.int32).reshape(rows-1, cols)[:, 1:].reshape(-1)
+        top = v - cols
+        if primitiveType == "quad":
+                return np.column_stack((v, top, top-1, v-1))
+        else: # primitiveType == "triangle"
+                faces = np.empty((2*len(v), 3), dtype=np.int32)
+                faces[0::2] = np.column_stack((v-1, top, top-1))
+                faces[1::2] = np.column_stack((v, top, v-1))
+                return faces
+
+
+def removeUnusedVertices(verts, faces):
+        """
+        Removes the vertices not used by any face
+        Returns the tuple (verts, faces, index);
+        index is an array with the new index of each original vertex or -1 for a removed one
+        """
+        used = np.zeros(len(verts), dtype=bool)
+        used[faces.reshape(-1)] = True
+        index = np.full(len(verts), -1, dtype=np.int32)
+        index[used] = np.arange(np.count_nonzero(used), dtype=np.int32)
+        return (verts[used], index[faces], index)
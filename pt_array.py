@@ -0,0 +1,568 @@
+"""
+The engine of the grid importer (io_import_scene_array.py)
+
+A .grid text file starts with the header line "nx ny incx incy minlon minlat"
+followed by nx*ny lines "lat lon height".
+A height-only text .grid file has the header line "nx ny incx incy minlon minlat heights"
+followed by nx*ny heights separated by whitespace, e.g. one height or one row of the heights per line.
+
+A binary .grid (version 2) file starts with the line "GRID2 heights" or "GRID2 heights,lats,lons"
+naming the arrays of the body, followed by the same header line as the text file.
+The header is padded with zero bytes to a multiple of binaryGridAlignment bytes, the arrays follow:
+the heights as little-endian float32, then the latitudes and the longitudes (if present)
+as little-endian float64, each array with ny*nx values stored row by row.
+The arrays are memory mapped by the importer.
+
+Without the latitudes and the longitudes (a height-only file) the post in the row j and the column i
+is at minlat + j*incy, minlon + i*incx. The grid is projected from a column of the latitudes and
+a row of the longitudes then, so the trigonometric functions of the projection are computed
+once per row and column rather than per post, see TransverseMercator.fromGeographicArray(..).
+The format is detected from the start of the file, see openGrid(..).
+
+ESRI ASCII grids (.asc) and raw .flt and .bil rasters with the .hdr sidecar are read too, see dem_formats.
+Their rows are stored from the north, they are flipped by a view of the array. The posts with
+the NODATA height of the raster are voids, the faces touching them are left out of the mesh.
+
+The module doesn't depend on Blender.
+"""
+
+import os, warnings
+import numpy as np
+
+from mesh_topology import gridFaces, removeUnusedVertices
+from rtin import triangulate
+from raster_ops import getHeightStats, blockAverage, getBudgetStride, resample, fillVoids
+from footprint import getGradedSpacing
+from dem_formats import openEsriAscii, openRawRaster, rawExtensions
+
+
+def readGridHeader(f):
+        """
+        Reads the header line of a .grid file
+        Returns the tuple (nx, ny, incx, incy, minlon, minlat)
+        """
+        return parseGridHeader(f.readline ())
+
+
+def parseGridHeader(line):
+        """
+        Parses the header line "nx ny incx incy minlon minlat" of a .grid file, see readGridHeader(..)
+        The word "heights" at the end of the line of a height-only text file is skipped
+        """
+        (snx, sny, sincx, sincy, sminlon, sminlat) = line.split()[:6];
+        return (int (snx), int (sny), float (sincx), float (sincy), float (sminlon), float (sminlat))
+
+
+binaryGridMagic = b"GRID2"
+
+binaryGridAlignment = 64
+
+binaryGridDtypes = {"heights": np.dtype("<f4"), "lats": np.dtype("<f8"), "lons": np.dtype("<f8")}
+
+
+def openGrid(filepath):
+        """
+        Opens the text or binary .grid file, the format is detected from the start of the file;
+        an ESRI ASCII grid or a raw raster is detected by the extension, see dem_formats
+        Returns the tuple (f, header, layout):
+        f is the open file positioned at the body, it is opened in the binary mode for the binary format
+        header is the tuple (nx, ny, incx, incy, minlon, minlat), see readGridHeader(..)
+        layout is a dictionary with the keys format ("text", "binary" or "raw"), arrays (the names of the arrays
+        of the body: ("heights",) or ("heights", "lats", "lons")) and offset (the offset of the body
+        of the binary format); the rasters of dem_formats also have the keys firstLine (the number of the first
+        line of the text body), northFirst, void (the height of the void posts or None), geographic
+        (False if minlon and minlat are projected x and y in meters) and for a raw raster dtype and rowLength
+        Raises ValueError for a file with an invalid header
+        """
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension == ".asc":
+                return openEsriAscii(filepath)
+        if extension in rawExtensions:
+                return openRawRaster(filepath)
+        f = open(filepath, "rb")
+        try:
+                if f.read(len(binaryGridMagic)) != binaryGridMagic:
+                        f.close()
+                        f = open(filepath)
+                        line = f.readline()
+                        try:
+                                header = parseGridHeader(line)
+                        except ValueError:
+                                raise ValueError("Invalid grid file %s, the header is \"%s\"" % (filepath, line.strip()))
+                        return (f, header, {
+                                "format": "text",
+                                "arrays": ("heights",) if line.split()[6:] == ["heights"] else ("heights", "lats", "lons")
+                        })
+                arrays = f.readline().decode("ascii").split()
+                arrays = tuple(arrays[0].split(",")) if arrays else ()
+                if not arrays or arrays[0] != "heights" or any(name not in binaryGridDtypes for name in arrays) \
+                                or len(arrays) not in (1, 3):
+                        raise ValueError("Invalid binary grid file %s" % filepath)
+                header = parseGridHeader(f.readline().decode("ascii"))
+                offset = -(-f.tell()//binaryGridAlignment)*binaryGridAlignment
+                size = sum(header[0]*header[1]*binaryGridDtypes[name].itemsize for name in arrays)
+                if os.fstat(f.fileno()).st_size < offset + size:
+                        raise ValueError("The binary grid file %s is truncated" % filepath)
+                return (f, header, {"format": "binary", "arrays": arrays, "offset": offset})
+        except:
+                f.close()
+                raise
+
+
+def writeBinaryGrid(filepath, header, heights, lats=None, lons=None):
+        """
+        Writes the binary .grid file
+        header is the tuple (nx, ny, incx, incy, minlon, minlat)
+        heights, lats and lons are arrays with nx*ny values stored row by row,
+        lats and lons are written only if they are given
+        """
+        arrays = [("heights", heights)]
+        if lats is not None:
+                arrays.extend((("lats", lats), ("lons", lons)))
+        with open(filepath, "wb") as f:
+                f.write(binaryGridMagic)
+                f.write((" %s\n" % ",".join(name for (name, values) in arrays)).encode("ascii"))
+                f.write(("%d %d %r %r %r %r\n" % tuple(header)).encode("ascii"))
+                f.write(bytes(-f.tell() % binaryGridAlignment))
+                for (name, values) in arrays:
+                        np.ascontiguousarray(values, dtype=binaryGridDtypes[name]).tofile(f)
+
+
+def writeTextHeightGrid(filepath, header, heights):
+        """
+        Writes the height-only text .grid file with one row of the heights per line
+        header is the tuple (nx, ny, incx, incy, minlon, minlat)
+        """
+        with open(filepath, "w") as f:
+                f.write("%d %d %r %r %r %r heights\n" % tuple(header))
+                np.savetxt(f, np.asarray(heights).reshape(header[1], header[0]), fmt="%.10g")
+
+
+def convertGrid(textPath, outputPath, heightsOnly=False):
+        """
+        Converts the text .grid file with the lines "lat lon height" to the binary one
+        or to the height-only text one if heightsOnly is True
+        The latitudes and the longitudes are written to the binary file only if the posts deviate from
+        the header geometry, i.e. the posts aren't stored row by row from minlat with the longitude changing first
+        or column by column from minlon with the latitude changing first (e.g. one path per longitude
+        like mkgrid.sh writes); the heights of the latter are transposed
+        Raises ValueError if the posts deviate from the header geometry for a height-only text file
+        """
+        with open(textPath) as f:
+                header = readGridHeader(f)
+                (nx, ny, incx, incy, minlon, minlat) = header
+                (lats, lons, heights) = readTextPosts(f, nx, ny)
+        latAxis = minlat + incy*np.arange(ny)
+        lonAxis = minlon + incx*np.arange(nx)
+        (lats, lons) = (lats.reshape(-1), lons.reshape(-1))
+        # about 1 cm
+        tolerance = 1e-7
+        def follows(values, expected):
+                return np.allclose(values, expected, rtol=0, atol=tolerance)
+        regular = follows(lats, np.repeat(latAxis, nx)) and follows(lons, np.tile(lonAxis, ny))
+        if not regular and follows(lats, np.tile(latAxis, nx)) and follows(lons, np.repeat(lonAxis, ny)):
+                # the posts are stored column by column
+                heights = heights.reshape(nx, ny).T
+                regular = True
+        if heightsOnly:
+                if not regular:
+                        raise ValueError("The posts of %s don't follow the header geometry, they need the latitudes and the longitudes" % textPath)
+                writeTextHeightGrid(outputPath, header, heights)
+        elif regular:
+                writeBinaryGrid(outputPath, header, heights)
+        else:
+                writeBinaryGrid(outputPath, header, heights, lats, lons)
+
+
+def readTextPosts(f, nx, ny):
+        """
+        Reads the nx*ny lines "lat lon height" of the text .grid file f positioned at its body
+        Returns the tuple (lats, lons, heights) of the arrays with the shape (ny, nx)
+        Raises ValueError with the line number for a malformed line or if the file ends too early
+        """
+        posts = readTextBody(f, 3*nx*ny, 3).reshape(ny, nx, 3)
+        return (posts[:,:,0], posts[:,:,1], posts[:,:,2])
+
+
+def readTextHeights(f, nx, ny, lineNumber=2):
+        """
+        Reads the nx*ny heights of the height-only text .grid file f positioned at its body
+        lineNumber is the number of the first line of the body
+        Returns the array of the heights with the shape (ny, nx)
+        Raises ValueError with the line number for a malformed line or if the file ends too early
+        """
+        return readTextBody(f, nx*ny, lineNumber=lineNumber).reshape(ny, nx)
+
+
+def readTextBody(f, numValues, valuesPerLine=None, lineNumber=2, chunkSize=1<<20):
+        """
+        Reads numValues numbers from the text file f positioned at the body of a .grid file
+        valuesPerLine is the number of the values each line must have, if it is None,
+        the values may be distributed among the lines in any way
+        lineNumber is the number of the first line of the body, the header of a .grid file is the line 1
+        The body is parsed in bulk by chunks of about chunkSize characters,
+        so the peak memory besides the result doesn't depend on the size of the file
+        The rest of the file after numValues values is ignored
+        Returns the flat array of the values
+        Raises ValueError with the line number for a malformed line or if the file ends too early
+        """
+        values = np.empty(numValues)
+        count = 0
+        # lineNumber is the number of the first line of the chunk
+        rest = b""
+        while count < numValues:
+                chunk = f.read(chunkSize)
+                data = rest + chunk.encode("utf-8")
+                if not chunk:
+                        if not data.strip():
+                                raise ValueError("The grid file ends at the line %s, %s of %s values are missing" %
+                                        (lineNumber-1, numValues-count, numValues))
+                        # the last line without the line break
+                        data += b"\n"
+                ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == 10)
+                numLines = len(ends)
+                if valuesPerLine:
+                        numLines = min(numLines, (numValues-count)//valuesPerLine)
+                if not numLines:
+                        rest = data
+                        continue
+                cut = ends[numLines-1] + 1
+                chunkValues = parseTextLines(data[:cut], ends[:numLines], lineNumber, valuesPerLine, numValues-count)
+                values[count:count+len(chunkValues)] = chunkValues
+                rest = data[cut:]
+                count += len(chunkValues)
+                lineNumber += numLines
+        return values
+
+
+def parseTextLines(data, ends, lineNumber, valuesPerLine, maxValues):
+        """
+        Parses the lines of the bytes data in bulk
+        ends is the array of the positions of the line breaks in data
+        lineNumber is the number of the first line in the file for the error message
+        valuesPerLine is the number of the values each line must have or None, see readTextBody(..)
+        Returns the flat array of at most maxValues values
+        """
+        numLines = len(ends)
+        # a token starts after a whitespace character
+        isSpace = np.frombuffer(data, dtype=np.uint8) <= 32
+        starts = np.flatnonzero(isSpace[:-1] > isSpace[1:]) + 1
+        if not isSpace[0]:
+                starts = np.concatenate(([0], starts))
+        bad = ()
+        if valuesPerLine:
+                bad = np.flatnonzero(np.bincount(np.searchsorted(ends, starts), minlength=numLines) != valuesPerLine)
+        if not len(bad):
+                try:
+                        with warnings.catch_warnings():
+                                # a token that isn't a number stops the parsing with a warning or an error
+                                warnings.simplefilter("ignore")
+                                values = np.fromstring(data, dtype=np.float64, sep=" ")
+                except ValueError:
+                        values = ()
+                if len(values) == len(starts) or len(values) >= maxValues:
+                        return values[:maxValues]
+        # parse line by line up to the first malformed line or until there are enough values
+        lines = data.splitlines()
+        values = []
+        for (i, line) in enumerate(lines):
+                tokens = line.split()
+                if valuesPerLine and len(tokens) != valuesPerLine:
+                        break
+                try:
+                        for token in tokens:
+                                values.append(float(token))
+                                if len(values) == maxValues:
+                                        return np.array(values)
+                except ValueError:
+                        break
+        else:
+                return np.array(values)
+        raise ValueError("Malformed line %s of the grid file, expected %s: %s" % (
+                lineNumber+i,
+                "\"lat lon height\"" if valuesPerLine else "heights",
+                line.decode("utf-8", "replace").strip()
+        ))
+
+
+class PtArray:
+
+        # SRTM3 data are sampled at three arc-seconds and contain 1201 lines and 1201 samples
+        size = 3600
+
+        voidValue = -32768
+
+        # the number of the grid rows projected at once
+        projectionBlockSize = 256
+
+        def __init__(self, **kwargs):
+                self.srtmDir = "."
+                self.voidSubstitution = 0
+                self.centerline = None
+                self.gradingSchedule = None
+                # the layout of the body of the grid, see openGrid(..); None stands for the text lines "lat lon height"
+                self.layout = None
+                # the spacing in meters of the resampled grid, 0 keeps the posts of the grid, see resamplePosts(..)
+                self.resampleSpacing = 0
+                self.resampleMethod = "bilinear"
+                # import every stride-th post in both directions
+                self.stride = 1
+                # if set, the stride is chosen to keep the number of the posts within vertexBudget
+                self.vertexBudget = 0
+                # "sample" takes every stride-th post, "average" averages the blocks of stride x stride posts
+                self.decimationMethod = "sample"
+                # if True, the voids are interpolated and kept in the mesh, otherwise the faces touching them are left out
+                self.fillVoids = False
+                
+                for key in kwargs:
+                        setattr(self, key, kwargs[key])
+                
+        def build(self):
+                """
+                Reads the posts of the grid from self.f, see readPosts()
+                Returns the tuple (verts, indices, stats)
+                verts is an array of vertices with the shape (nx*ny, 3)
+                indices is an array of faces: quads or triangles depending on self.primitiveType;
+                for the primitive type "rtin" only the posts used by the adaptive triangulation are in verts
+                The grid is decimated with self.stride or self.vertexBudget first, see decimatePosts(..)
+                If self.resampleSpacing is set, the grid is resampled onto the posts with that spacing in meters
+                in the plane of the projection, see resamplePosts(..)
+                If self.centerline and self.gradingSchedule are set, the mesh is triangulated with the density graded
+                with the distance from the centerline for any primitive type, see footprint.getGradedSpacing(..)
+                The void posts of a raster (see getVoid(..)) get the heights interpolated from the posts
+                around them, the faces touching them are left out of the mesh unless self.fillVoids is set
+                stats is a dictionary with the height statistics of the mesh posts, see raster_ops.getHeightStats(..)
+                """
+                (lats, lons, heights) = self.readPosts()
+                (lats, lons, heights, void) = self.decimatePosts(lats, lons, heights, self.getVoid(heights))
+                if void is not None:
+                        heights = fillVoids(heights, void)
+                # the voids left out of the mesh
+                holes = None if self.fillVoids else void
+                if self.resampleSpacing:
+                        (grid, valid) = self.resamplePosts(lats, lons, heights, holes)
+                        heights = grid[:,:,2]
+                        stats = getHeightStats(heights[valid], void)
+                else:
+                        grid = self.projectPosts(lats, lons, heights)
+                        valid = None if holes is None else ~holes
+                        stats = getHeightStats(heights if valid is None else heights[valid], void)
+                (numRows, numCols) = heights.shape
+                verts = grid.reshape(-1, 3)
+                
+                graded = self.centerline is not None and bool(self.gradingSchedule)
+                if self.primitiveType == "rtin" or graded:
+                        (rows, cols, indices) = triangulate(
+                                heights,
+                                self.maxError if self.primitiveType == "rtin" else None,
+                                spacing = getGradedSpacing(
+                                        grid[:,:,0],
+                                        grid[:,:,1],
+                                        self.centerline,
+                                        self.gradingSchedule
+                                ) if graded else None
+                        )
+                        posts = rows*numCols + cols
+                        verts = verts[posts]
+                else:
+                        indices = gridFaces(numRows, numCols, self.primitiveType)
+                        posts = None
+                if valid is not None:
+                        # only the faces within the original grid and without the voids are kept
+                        valid = valid.reshape(-1) if posts is None else valid.reshape(-1)[posts]
+                        indices = indices[valid[indices].all(axis=1)]
+                        (verts, indices) = removeUnusedVertices(verts, indices)[:2]
+                return (verts, indices, stats)
+
+        def readPosts(self):
+                """
+                Returns the tuple (lats, lons, heights); heights is an array with the shape (ny, nx),
+                lats and lons are broadcast to it: either arrays of the same shape or, for a height-only grid,
+                a column of the latitudes with the shape (ny, 1) and a row of the longitudes with the shape (1, nx)
+                The arrays of a binary grid and of a raw raster are memory mapped
+                """
+                layout = self.layout or {"format": "text", "arrays": ("heights", "lats", "lons")}
+                shape = (self.ny, self.nx)
+                if layout["format"] == "binary":
+                        offset = layout["offset"]
+                        arrays = {}
+                        for name in layout["arrays"]:
+                                dtype = binaryGridDtypes[name]
+                                arrays[name] = np.memmap(self.f, dtype=dtype, mode="r", offset=offset, shape=shape)
+                                offset += self.nx*self.ny*dtype.itemsize
+                        if "lats" in arrays:
+                                return (arrays["lats"], arrays["lons"], arrays["heights"])
+                        heights = arrays["heights"]
+                elif layout["format"] == "raw":
+                        # the padding at the end of the rows is skipped by a view
+                        heights = np.memmap(self.f, dtype=layout["dtype"], mode="r", offset=layout["offset"],
+                                shape=(self.ny, layout["rowLength"]))[:,:self.nx]
+                elif "lats" in layout["arrays"]:
+                        return readTextPosts(self.f, self.nx, self.ny)
+                else:
+                        heights = readTextHeights(self.f, self.nx, self.ny, layout.get("firstLine", 2))
+                if layout.get("northFirst"):
+                        heights = heights[::-1]
+                return (
+                        (self.minlat + self.incy*np.arange(self.ny))[:,None],
+                        (self.minlon + self.incx*np.arange(self.nx))[None,:],
+                        heights
+                )
+
+        def getVoid(self, heights):
+                """
+                Returns the boolean array marking the void posts of a raster with the NODATA height
+                set in self.layout or None if there are no voids
+                """
+                voidValue = (self.layout or {}).get("void")
+                if voidValue is None:
+                        return None
+                void = np.isnan(heights) if np.isnan(voidValue) else heights == voidValue
+                return void if void.any() else None
+
+        def getStride(self, numRows, numCols):
+                if self.vertexBudget:
+                        return getBudgetStride(numRows, numCols, self.vertexBudget)
+                return self.stride
+
+        def decimatePosts(self, lats, lons, heights, void):
+                """
+                Decimates the posts returned by readPosts() and the boolean array void marking the void posts
+                (or None) with the stride of getStride(..): self.decimationMethod "sample" takes every stride-th post,
+                "average" averages the blocks of stride x stride posts excluding the voids
+                Returns the tuple (lats, lons, heights, void) of the decimated arrays
+                """
+                stride = self.getStride(*heights.shape)
+                if stride == 1:
+                        return (lats, lons, heights, void)
+                if self.decimationMethod == "sample":
+                        return (
+                                lats[::stride, ::stride],
+                                lons[::stride, ::stride],
+                                heights[::stride, ::stride],
+                                None if void is None else void[::stride, ::stride]
+                        )
+                if void is None:
+                        heights = blockAverage(heights, stride)
+                else:
+                        # a block gets a void only if all its posts are voids
+                        heights = blockAverage(np.where(void, self.voidValue, heights), stride, self.voidValue)
+                        void = heights == self.voidValue
+                        if not void.any():
+                                void = None
+                return (blockAverage(lats, stride), blockAverage(lons, stride), heights, void)
+
+        def projectPosts(self, lats, lons, heights):
+                """
+                Returns the array of the projected posts with the shape of heights plus the axis of x, y, z,
+                see readPosts()
+                """
+                (numRows, numCols) = heights.shape
+                verts = np.empty((numRows, numCols, 3), dtype=np.float32)
+                # project the grid by blocks of rows to limit the size of the temporary arrays
+                for row in range(0, numRows, self.projectionBlockSize):
+                        rows = slice(row, row+self.projectionBlockSize)
+                        (verts[rows,:,0], verts[rows,:,1]) = self.projection.fromGeographicArray(
+                                lats[rows],
+                                lons if len(lons) == 1 else lons[rows]
+                        )
+                verts[:,:,2] = heights
+                return verts
+
+        def resamplePosts(self, lats, lons, heights, void=None):
+                """
+                Resamples the grid onto the posts spaced by self.resampleSpacing meters along the x and y axes
+                of the projection, the posts are at the multiples of the spacing
+                The heights are interpolated by raster_ops.resample(..) with self.resampleMethod; if the spacing is
+                at least twice the spacing of the grid, the heights are block averaged first to avoid aliasing;
+                the partial blocks on the border are dropped to keep the averaged grid uniform, the posts beyond
+                the centers of the last whole blocks are interpolated from the grid itself
+                The grid must be a lattice in the geographic coordinates: the latitude and the longitude change
+                linearly along the rows and the columns, e.g. a grid stored row by row or column by column
+                lats, lons and heights are the arrays returned by readPosts(), void is the optional boolean array
+                marking the void posts of the grid
+                Returns the tuple (grid, valid): grid is the array of the projected posts with the shape (rows, cols, 3),
+                valid is a boolean array marking the posts within the original grid and away from the voids
+                Raises ValueError if the grid can't be resampled
+                """
+                (ny, nx) = heights.shape
+                spacing = float(self.resampleSpacing)
+                if nx < 2 or ny < 2:
+                        raise ValueError("The grid must have at least 2 posts along each axis to be resampled")
+                def corner(values, row, col):
+                        return float(values[row if values.shape[0] > 1 else 0, col if values.shape[1] > 1 else 0])
+                lat0 = corner(lats, 0, 0)
+                lon0 = corner(lons, 0, 0)
+                # the change of the latitude and the longitude per row and per column
+                lattice = np.array((
+                        ((corner(lats, -1, 0)-lat0)/(ny-1), (corner(lats, 0, -1)-lat0)/(nx-1)),
+                        ((corner(lons, -1, 0)-lon0)/(ny-1), (corner(lons, 0, -1)-lon0)/(nx-1))
+                ))
+                try:
+                        inverse = np.linalg.inv(lattice)
+                except np.linalg.LinAlgError:
+                        raise ValueError("The posts of the grid don't form a lattice, it can't be resampled")
+
+                # the projected border of the grid: the first and the last column, the first and the last row
+                borderRows = np.concatenate((np.arange(ny), np.arange(ny), np.zeros(nx), np.full(nx, ny-1)))
+                borderCols = np.concatenate((np.zeros(ny), np.full(ny, nx-1), np.arange(nx), np.arange(nx)))
+                (x, y) = self.projection.fromGeographicArray(
+                        lat0 + lattice[0,0]*borderRows + lattice[0,1]*borderCols,
+                        lon0 + lattice[1,0]*borderRows + lattice[1,1]*borderCols
+                )
+                xs = np.arange(np.ceil(x.min()/spacing), np.floor(x.max()/spacing)+1) * spacing
+                ys = np.arange(np.ceil(y.min()/spacing), np.floor(y.max()/spacing)+1) * spacing
+                if len(xs) < 2 or len(ys) < 2:
+                        raise ValueError("The resample spacing %sm is too large for the grid" % spacing)
+
+                # the spacing of the grid in meters along the columns and the rows
+                gridSpacing = max(
+                        np.hypot(x[ny-1]-x[0], y[ny-1]-y[0])/(ny-1),
+                        np.hypot(x[2*ny+nx-1]-x[2*ny], y[2*ny+nx-1]-y[2*ny])/(nx-1)
+                )
+                stride = int(spacing/gridSpacing)
+                if void is not None:
+                        # the posts interpolated from a void get a nonzero weight
+                        void = void.astype(np.float32)
+                # the numbers of the whole blocks
+                (numRows, numCols) = (ny // stride, nx // stride)
+                if stride >= 2 and numRows and numCols:
+                        averaged = blockAverage(heights, stride)[:numRows,:numCols]
+                        if void is not None:
+                                averagedVoid = blockAverage(void, stride)[:numRows,:numCols]
+                        # the averaged block i is centered at the post i*stride + (stride-1)/2 of the grid
+                        first = 0.5*(stride-1)
+                        (lastRow, lastCol) = ((numRows-1)*stride + first, (numCols-1)*stride + first)
+                else:
+                        stride = 1
+
+                grid = np.empty((len(ys), len(xs), 3), dtype=np.float32)
+                grid[:,:,0] = xs
+                grid[:,:,1] = ys[:,None]
+                valid = np.empty((len(ys), len(xs)), dtype=bool)
+                # a tolerance for the posts on the border of the grid
+                tolerance = 1e-6
+                for row in range(0, len(ys), self.projectionBlockSize):
+                        rows = slice(row, row+self.projectionBlockSize)
+                        (lat, lon) = self.projection.toGeographicArray(xs, ys[rows,None])
+                        lat -= lat0
+                        lon -= lon0
+                        # the fractional row and column of the grid for each post
+                        r = inverse[0,0]*lat + inverse[0,1]*lon
+                        c = inverse[1,0]*lat + inverse[1,1]*lon
+                        valid[rows] = (r > -tolerance) & (r < ny-1+tolerance) & (c > -tolerance) & (c < nx-1+tolerance)
+                        z = resample(heights, r, c, self.resampleMethod)
+                        if void is not None:
+                                isVoid = resample(void, r, c, "bilinear") != 0.
+                        if stride >= 2:
+                                # the posts between the centers of the averaged blocks
+                                inner = (r >= first) & (r <= lastRow) & (c >= first) & (c <= lastCol)
+                                rb = (r - first)/stride
+                                cb = (c - first)/stride
+                                z = np.where(inner, resample(averaged, rb, cb, self.resampleMethod), z)
+                                if void is not None:
+                                        isVoid = np.where(inner, resample(averagedVoid, rb, cb, "bilinear") != 0., isVoid)
+                        grid[rows,:,2] = z
+                        if void is not None:
+                                valid[rows] &= ~isVoid
+                return (grid, valid)
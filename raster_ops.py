@@ -0,0 +1,184 @@
+"""
+Vectorized operations on elevation rasters shared by the importers
+"""
+
+import numpy as np
+
+# the keys of the dictionary returned by getHeightStats(..)
+heightStatsNames = ("minHeight", "maxHeight", "meanHeight", "voidCount", "heightHistogram")
+
+
+def _blockSums(values, valid, stride):
+        """
+        Returns the tuple (sums, counts) for the blocks of stride samples along each axis
+        of a 1D or 2D array; only the valid samples are summed and counted
+        """
+        dtype = np.promote_types(values.dtype, np.float32)
+        shape = values.shape
+        numBlocks = [-(-n//stride) for n in shape]
+        padded = np.zeros([n*stride for n in numBlocks], dtype=dtype)
+        paddedValid = np.zeros(padded.shape, dtype=bool)
+        region = tuple(slice(0, n) for n in shape)
+        padded[region] = values
+        paddedValid[region] = valid
+        padded[~paddedValid] = 0
+
+        # each axis is split into the axes (number of blocks, stride)
+        blockShape = []
+        for n in numBlocks:
+                blockShape.extend((n, stride))
+        # the axes with the samples of a block
+        axes = tuple(range(1, 2*len(shape), 2))
+        return (padded.reshape(blockShape).sum(axis=axes), paddedValid.reshape(blockShape).sum(axis=axes))
+
+
+def blockAverage(values, stride, voidValue=None):
+        """
+        Averages the blocks of stride samples along each axis of a 1D or 2D array
+        The blocks at the end of an axis may be smaller if its length isn't a multiple of stride
+        Samples equal to voidValue are excluded from the average;
+        a block without other samples gets voidValue
+        Returns a float32 array or a float64 one for float64 values
+        """
+        dtype = np.promote_types(values.dtype, np.float32)
+        (sums, counts) = _blockSums(values, True if voidValue is None else (values!=voidValue), stride)
+        result = (sums/np.maximum(counts, 1)).astype(dtype)
+        if voidValue is not None:
+                result[counts==0] = voidValue
+        return result
+
+
+def _interpolate(values, ys, xs):
+        """
+        Interpolates the 2D array values bilinearly at the fractional indices ys, xs,
+        the indices are clamped to the array
+        """
+        (numRows, numCols) = values.shape
+        ys = np.clip(ys, 0, numRows-1)
+        xs = np.clip(xs, 0, numCols-1)
+        y0 = np.minimum(ys.astype(np.intp), max(numRows-2, 0))
+        x0 = np.minimum(xs.astype(np.intp), max(numCols-2, 0))
+        y1 = np.minimum(y0+1, numRows-1)
+        x1 = np.minimum(x0+1, numCols-1)
+        ty = ys - y0
+        tx = xs - x0
+        return (1-ty)*((1-tx)*values[y0, x0] + tx*values[y0, x1]) + ty*((1-tx)*values[y1, x0] + tx*values[y1, x1])
+
+
+def _cubicWeights(t):
+        """
+        Returns the weights of the 4 samples around the fractional position t (0 <= t < 1)
+        for the cubic convolution with a = -0.5 (Catmull-Rom)
+        """
+        return (
+                ((-0.5*t + 1.)*t - 0.5)*t,
+                (1.5*t - 2.5)*t*t + 1.,
+                ((-1.5*t + 2.)*t + 0.5)*t,
+                (0.5*t - 0.5)*t*t
+        )
+
+
+def resample(values, ys, xs, method="bilinear"):
+        """
+        Interpolates the 2D array values at the fractional indices ys, xs (arrays broadcast against each other),
+        the indices are clamped to the array
+        method is "bilinear" or "bicubic" (cubic convolution); the cubic kernel would need the samples beyond the border,
+        so the bicubic interpolation falls back to the bilinear one within the cells at the border of the array
+        """
+        if method == "bilinear":
+                return _interpolate(values, ys, xs)
+        (numRows, numCols) = values.shape
+        ys = np.clip(ys, 0, numRows-1)
+        xs = np.clip(xs, 0, numCols-1)
+        y0 = np.floor(ys).astype(np.intp)
+        x0 = np.floor(xs).astype(np.intp)
+        rows = [np.clip(y0+i, 0, numRows-1) for i in (-1, 0, 1, 2)]
+        cols = [np.clip(x0+i, 0, numCols-1) for i in (-1, 0, 1, 2)]
+        colWeights = _cubicWeights(xs - x0)
+        result = 0.
+        for (row, rowWeight) in zip(rows, _cubicWeights(ys - y0)):
+                rowValues = 0.
+                for (col, colWeight) in zip(cols, colWeights):
+                        rowValues = rowValues + colWeight*values[row, col]
+                result = result + rowWeight*rowValues
+        border = (ys < 1) | (ys > numRows-2) | (xs < 1) | (xs > numCols-2)
+        if border.any():
+                (ys, xs, border) = np.broadcast_arrays(ys, xs, border)
+                result = np.array(np.broadcast_to(result, border.shape))
+                result[border] = _interpolate(values, ys[border], xs[border])
+        return result
+
+
+def fillVoids(values, void, iterations=16):
+        """
+        Fills the posts of a 2D raster marked by the boolean array void by Laplacian interpolation
+        from the valid posts around them
+        The raster is solved with a multigrid scheme: the voids of a half resolution raster are filled first
+        (recursively), its bilinearly interpolated heights are the initial guess for the voids, then the voids are
+        relaxed with iterations Jacobi sweeps. Only the void posts are touched by the sweeps, so their cost depends on
+        the number of voids; the block sums and the interpolation of each level run over the whole raster of that level,
+        so the total cost grows with the size of the raster too
+        The posts outside the raster are treated as a copy of the nearest border post
+        Returns a float32 array; a raster without any valid post is filled with zeros
+        """
+        heights = np.array(values, dtype=np.float32)
+        if not void.any():
+                return heights
+        if void.all():
+                heights[:] = 0
+                return heights
+        (numRows, numCols) = heights.shape
+        (rows, cols) = np.nonzero(void)
+
+        # the initial guess from the half resolution raster
+        if numRows > 2 or numCols > 2:
+                (sums, counts) = _blockSums(heights, ~void, 2)
+                coarse = fillVoids(sums/np.maximum(counts, 1), counts==0, iterations)
+                heights[rows, cols] = _interpolate(coarse, (rows-0.5)/2, (cols-0.5)/2)
+        else:
+                heights[rows, cols] = heights[~void].mean()
+
+        # the flat indices of the void posts and of their four neighbors
+        flat = heights.reshape(-1)
+        index = rows*numCols + cols
+        neighbors = (
+                np.maximum(rows-1, 0)*numCols + cols,
+                np.minimum(rows+1, numRows-1)*numCols + cols,
+                index - (cols>0),
+                index + (cols<numCols-1)
+        )
+        for _ in range(iterations):
+                flat[index] = 0.25*(flat[neighbors[0]] + flat[neighbors[1]] + flat[neighbors[2]] + flat[neighbors[3]])
+        return heights
+
+
+def getBudgetStride(numRows, numCols, vertexBudget):
+        """
+        Returns the smallest stride that keeps the number of the sampled posts of
+        the raster numRows x numCols within vertexBudget
+        """
+        stride = max(1, int(np.ceil(np.sqrt(numRows*numCols/vertexBudget))))
+        while (-(-numRows//stride)) * (-(-numCols//stride)) > vertexBudget:
+                stride += 1
+        return stride
+
+
+def getHeightStats(heights, void=None, bins=64):
+        """
+        Returns the dictionary with the statistics of the raster heights, see heightStatsNames:
+        the minimum, maximum and mean height, the number of the void posts marked by the boolean array void
+        and the histogram of the heights with bins equal bins between the minimum and the maximum height
+        """
+        if heights.size:
+                minHeight = heights.min()
+                maxHeight = heights.max()
+                meanHeight = heights.mean(dtype=np.float64)
+        else:
+                minHeight = maxHeight = meanHeight = 0
+        return dict(
+                minHeight = np.float64(minHeight),
+                maxHeight = np.float64(maxHeight),
+                meanHeight = np.float64(meanHeight),
+                voidCount = np.int64(np.count_nonzero(void) if void is not None else 0),
+                heightHistogram = np.histogram(heights, bins, range=(minHeight, maxHeight))[0].astype(np.int32)
+        )
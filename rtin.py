@@ -0,0 +1,215 @@
+"""
+Right-triangulated irregular network (RTIN) for elevation rasters
+
+The raster is covered by a binary tree of right isosceles triangles: each triangle is split
+at the midpoint of its hypotenuse into two halves. A triangle is split only if the height at that
+midpoint deviates from the linear interpolation along the hypotenuse by more than maxError
+(taking into account the errors of all its descendants), so flat terrain gets large triangles
+and the detail is kept where the terrain needs it. The resulting mesh has no cracks.
+
+See the description of the algorithm at
+https://www.cs.ubc.ca/~will/papers/rtin.pdf
+and the reference implementation at
+https://github.com/mapbox/martini
+
+The error of the triangle tree is computed level by level with array slicing,
+the tree is descended level by level as well.
+
+Besides the height error, the size of the triangles can be limited per post (see getErrors(..)),
+e.g. to grade the mesh density with the distance from a track. The triangles needed to keep the mesh
+conforming form the transition strips between the areas of different density.
+"""
+
+import numpy as np
+
+
+def _maxFromNeighbors(errors, rows, cols, dy, dx):
+        """
+        Sets errors[rows, cols] to the maximum of itself and errors[rows+dy, cols+dx]
+        rows and cols are arrays of indices; the neighbors outside the raster are skipped
+        """
+        n = errors.shape[0] - 1
+        rows = rows[(rows+dy>=0) & (rows+dy<=n)]
+        cols = cols[(cols+dx>=0) & (cols+dx<=n)]
+        if len(rows) and len(cols):
+                index = np.ix_(rows, cols)
+                errors[index] = np.maximum(errors[index], errors[np.ix_(rows+dy, cols+dx)])
+
+
+def _forceSplit(errors, rows, cols, h, numRows, numCols, keepBorder):
+        """
+        The triangles with the hypotenuse midpoint at rows, cols lie within the square
+        of the half size h around the midpoint. If a square crosses the border of the raster
+        numRows x numCols, its triangles are forced to be split, so that every final triangle
+        lies either completely inside or completely outside the raster
+        If keepBorder is True, the triangles with the hypotenuse midpoint at the border of the raster
+        are forced to be split too, so all posts at the border become mesh vertices
+        """
+        crossRows = (rows-h < numRows-1) & (rows+h > numRows-1)
+        crossCols = (cols-h < numCols-1) & (cols+h > numCols-1)
+        insideRows = rows-h < numRows-1
+        insideCols = cols-h < numCols-1
+        force = (crossRows[:,None] & insideCols) | (insideRows[:,None] & crossCols)
+        if keepBorder:
+                borderRows = (rows==0) | (rows==numRows-1)
+                borderCols = (cols==0) | (cols==numCols-1)
+                force |= (borderRows[:,None] & (cols<numCols)) | ((rows<numRows)[:,None] & borderCols)
+        if force.any():
+                sub = errors[np.ix_(rows, cols)]
+                sub[force] = np.inf
+                errors[np.ix_(rows, cols)] = sub
+
+
+def _limitSize(errors, spacing, rows, cols, legLength):
+        """
+        Forces the triangles with the hypotenuse midpoint at rows, cols (slices) to be split
+        if their leg length exceeds the spacing allowed at the midpoint
+        """
+        sub = errors[rows, cols]
+        sub[spacing[rows, cols] < legLength] = np.inf
+        errors[rows, cols] = sub
+
+
+def getErrors(heights, keepBorder=False, spacing=None):
+        """
+        Returns the tuple (errors, n)
+        errors is a (n+1)x(n+1) array, n is a power of two so that the raster fits into it;
+        errors[y, x] is the maximum error of the triangles with the hypotenuse midpoint at y, x
+        and of all their descendants
+        keepBorder is explained in _forceSplit(..)
+        spacing is an optional array of the shape of heights with the maximum leg length of the triangles
+        (in posts) allowed at each post; the triangles exceeding it get an infinite error
+        """
+        (numRows, numCols) = heights.shape
+        n = 2
+        while n < max(numRows, numCols) - 1:
+                n *= 2
+        # extend the raster to (n+1)x(n+1) posts by repeating its last row and column
+        terrain = np.pad(
+                np.asarray(heights, dtype=np.float32),
+                ((0, n+1-numRows), (0, n+1-numCols)),
+                mode="edge"
+        )
+        errors = np.zeros((n+1, n+1), dtype=np.float32)
+        force = keepBorder or numRows < n+1 or numCols < n+1
+        if spacing is not None:
+                spacing = np.pad(
+                        np.asarray(spacing, dtype=np.float32),
+                        ((0, n+1-numRows), (0, n+1-numCols)),
+                        mode="edge"
+                )
+
+        # going from the smallest triangles to the largest ones
+        s = 2
+        while s <= n:
+                h = s//2
+                q = s//4
+
+                # the triangles with a horizontal hypotenuse of the length s
+                rows = np.arange(0, n+1, s)
+                cols = np.arange(h, n, s)
+                errors[0::s, h::s] = np.abs(terrain[0::s, h::s] - 0.5*(terrain[0::s, 0:n:s] + terrain[0::s, s::s]))
+                if spacing is not None:
+                        _limitSize(errors, spacing, slice(0, n+1, s), slice(h, n, s), h*np.sqrt(2))
+                if force:
+                        _forceSplit(errors, rows, cols, h, numRows, numCols, keepBorder)
+                if q:
+                        for (dy, dx) in ((-q,-q), (-q,q), (q,-q), (q,q)):
+                                _maxFromNeighbors(errors, rows, cols, dy, dx)
+
+                # the triangles with a vertical hypotenuse of the length s
+                rows = np.arange(h, n, s)
+                cols = np.arange(0, n+1, s)
+                errors[h::s, 0::s] = np.abs(terrain[h::s, 0::s] - 0.5*(terrain[0:n:s, 0::s] + terrain[s::s, 0::s]))
+                if spacing is not None:
+                        _limitSize(errors, spacing, slice(h, n, s), slice(0, n+1, s), h*np.sqrt(2))
+                if force:
+                        _forceSplit(errors, rows, cols, h, numRows, numCols, keepBorder)
+                if q:
+                        for (dy, dx) in ((-q,-q), (-q,q), (q,-q), (q,q)):
+                                _maxFromNeighbors(errors, rows, cols, dy, dx)
+
+                # the triangles with a diagonal hypotenuse, the diagonal of a square of the size s
+                center = terrain[h::s, h::s]
+                # the square with the indices i, j has the diagonal from its top left to its bottom right
+                # corner if i+j is even and the diagonal from its bottom left to its top right corner otherwise
+                mainDiagonal = 0.5*(terrain[0:n:s, 0:n:s] + terrain[s::s, s::s])
+                otherDiagonal = 0.5*(terrain[s::s, 0:n:s] + terrain[0:n:s, s::s])
+                (i, j) = np.indices(center.shape)
+                errors[h::s, h::s] = np.abs(center - np.where((i+j)%2==0, mainDiagonal, otherDiagonal))
+                if spacing is not None:
+                        _limitSize(errors, spacing, slice(h, n, s), slice(h, n, s), s)
+                rows = np.arange(h, n, s)
+                cols = np.arange(h, n, s)
+                if force:
+                        _forceSplit(errors, rows, cols, h, numRows, numCols, keepBorder)
+                # the children of these triangles have the hypotenuse midpoints
+                # in the middle of the sides of the square
+                for (dy, dx) in ((-h,0), (h,0), (0,-h), (0,h)):
+                        _maxFromNeighbors(errors, rows, cols, dy, dx)
+
+                s *= 2
+        return (errors, n)
+
+
+def triangulate(heights, maxError, keepBorder=False, spacing=None):
+        """
+        Builds the RTIN mesh for the raster heights with the given maximum vertical error
+        If maxError is None, the heights are ignored and the triangles are split only to satisfy
+        keepBorder and spacing
+        If keepBorder is True, all posts at the border of the raster are used as mesh vertices,
+        so the meshes of neighboring rasters sharing the border match each other
+        spacing limits the size of the triangles, see getErrors(..)
+        Returns the tuple (rows, cols, faces)
+        rows and cols are arrays with the raster indices of the posts used as the mesh vertices,
+        faces is an (m, 3) array of the triangles, each one is composed of 3 indices of rows and cols
+        The triangles have the same orientation as those of mesh_topology.gridFaces(..)
+        """
+        (numRows, numCols) = heights.shape
+        if maxError is None:
+                heights = np.zeros(heights.shape, dtype=np.float32)
+                maxError = 0
+        (errors, n) = getErrors(heights, keepBorder, spacing)
+
+        # the triangle a, b, c has the hypotenuse a-b and the right angle at c;
+        # we start from the two triangles covering the whole square
+        ax = np.array((0, n), dtype=np.int32)
+        ay = np.array((0, n), dtype=np.int32)
+        bx = np.array((n, 0), dtype=np.int32)
+        by = np.array((n, 0), dtype=np.int32)
+        cx = np.array((n, 0), dtype=np.int32)
+        cy = np.array((0, n), dtype=np.int32)
+        triangles = []
+        while len(ax):
+                mx = (ax + bx)//2
+                my = (ay + by)//2
+                split = (np.abs(ax-cx) + np.abs(ay-cy) > 1) & (errors[my, mx] > maxError)
+                keep = ~split
+                triangles.append(np.column_stack((ax[keep], ay[keep], bx[keep], by[keep], cx[keep], cy[keep])))
+                (ax, ay, bx, by, cx, cy, mx, my) = (v[split] for v in (ax, ay, bx, by, cx, cy, mx, my))
+                # the triangles c, a, m and b, c, m
+                (ax, ay, bx, by, cx, cy) = (
+                        np.concatenate((cx, bx)),
+                        np.concatenate((cy, by)),
+                        np.concatenate((ax, cx)),
+                        np.concatenate((ay, cy)),
+                        np.concatenate((mx, mx)),
+                        np.concatenate((my, my))
+                )
+        triangles = np.concatenate(triangles)
+        xs = triangles[:, 0::2]
+        ys = triangles[:, 1::2]
+        # skip the triangles in the area added to the raster by getErrors(..)
+        inside = (xs.max(axis=1) < numCols) & (ys.max(axis=1) < numRows)
+        xs = xs[inside]
+        ys = ys[inside]
+
+        # orient the triangles like mesh_topology.gridFaces(..) does
+        cross = (xs[:,1]-xs[:,0])*(ys[:,2]-ys[:,0]) - (ys[:,1]-ys[:,0])*(xs[:,2]-xs[:,0])
+        flip = cross > 0
+        xs[flip] = xs[flip][:, ::-1]
+        ys[flip] = ys[flip][:, ::-1]
+
+        (posts, faces) = np.unique(ys*numCols + xs, return_inverse=True)
+        faces = faces.reshape(-1, 3).astype(np.int32)
+        return (posts//numCols, posts%numCols, faces)
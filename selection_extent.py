@@ -0,0 +1,56 @@
+"""
+The extent of the selected objects and the outline of a mask object used by the importers to limit the imported area
+"""
+
+import bpy
+import numpy as np
+
+
+def getSelectionBoundingBox(context, margin=0):
+        """
+        Returns the bounding box of the selected objects in the world coordinates as the dictionary
+        with the keys xmin, ymin, xmax, ymax or None if no objects are selected
+        The box is extended by margin (in meters) on each side
+        The bounding box corners are collected object by object, then they are transformed to the world coordinates
+        for all objects at once with a batched matrix product
+        """
+        # perform context.scene.update(), otherwise o.matrix_world or o.bound_box are incorrect
+        context.scene.update()
+        objects = context.selected_objects
+        if not objects:
+                return None
+        # homogeneous coordinates of the 8 corners of the local bounding box of each object
+        corners = np.ones((len(objects), 8, 4))
+        corners[:,:,:3] = [o.bound_box for o in objects]
+        matrices = np.array([o.matrix_world for o in objects])
+        # the corners in the world coordinates
+        corners = np.einsum("nij,nkj->nki", matrices, corners)
+        (xmin, ymin) = corners[:,:,:2].min(axis=(0, 1))
+        (xmax, ymax) = corners[:,:,:2].max(axis=(0, 1))
+        return {"xmin": float(xmin-margin), "ymin": float(ymin-margin), "xmax": float(xmax+margin), "ymax": float(ymax+margin)}
+
+
+def getObjectOutline(obj, scene):
+        """
+        Returns the tuple (segments, boundary) for the curve or mesh object in the world coordinates,
+        see footprint.Footprint: segments are the edges not shared by two faces (wire edges and
+        the boundary of the faces), boundary is the boundary of the faces
+        A curve is converted to a mesh with its modifiers and its fill applied
+        """
+        mesh = obj.to_mesh(scene, True, "PREVIEW")
+        try:
+                co = np.empty(3*len(mesh.vertices), dtype=np.float32)
+                mesh.vertices.foreach_get("co", co)
+                co = np.column_stack((co.reshape(-1, 3), np.ones(len(mesh.vertices))))
+                # the vertices in the world coordinates
+                xy = co.dot(np.array(obj.matrix_world).T)[:,:2]
+                edges = np.empty(2*len(mesh.edges), dtype=np.int32)
+                mesh.edges.foreach_get("vertices", edges)
+                edges = edges.reshape(-1, 2)
+                loopEdges = np.empty(len(mesh.loops), dtype=np.int32)
+                mesh.loops.foreach_get("edge_index", loopEdges)
+        finally:
+                bpy.data.meshes.remove(mesh)
+        # the number of faces using each edge
+        numFaces = np.bincount(loopEdges, minlength=len(edges))
+        return (xy[edges[numFaces<2]], xy[edges[numFaces==1]])
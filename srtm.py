@@ -0,0 +1,459 @@
+"""
+Import of SRTM data from .hgt tiles
+
+Srtm.size is the target post spacing given as the number of intervals between the samples of a tile row:
+1200 for SRTM3 and 3600 for SRTM1 data. Tiles of a different resolution are resampled to it,
+so a mosaic may mix SRTM1 and SRTM3 tiles.
+"""
+
+import math, os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from hgt_tiles import readWindow, decodeWindow, resampleWindow, getTileSize, findTile
+from mesh_topology import gridFaces, removeUnusedVertices
+from raster_ops import blockAverage, getBudgetStride, fillVoids, getHeightStats, heightStatsNames
+from rtin import triangulate
+from footprint import Footprint, getGradedSpacing
+from terrain_cache import getFileStamp
+from tile_index import getTileName
+
+
+def getSrtmIntervals(x1, x2):
+        """
+        Split (x1, x2) into SRTM intervals. Examples:
+        (31.2, 32.7) => [ (31.2, 32), (32, 32.7) ]
+        (31.2, 32) => [ (31.2, 32) ]
+        """
+        _x1 = x1
+        intervals = []
+        while True:
+                _x2 = math.floor(_x1 + 1)
+                if (_x2>=x2):
+                        intervals.append((_x1, x2))
+                        break
+                else:
+                        intervals.append((_x1, _x2))
+                        _x1 = _x2
+        return intervals
+
+
+class Srtm:
+
+        voidValue = -32768
+
+        # the number of raster rows projected at once
+        projectionBlockSize = 256
+
+        # the maximum number of tiles read at the same time
+        maxReadThreads = 16
+
+        def __init__(self, **kwargs):
+                self.srtmDir = "."
+                self.voidSubstitution = 0
+                # if True, the voids are interpolated from the posts around them instead of using voidSubstitution
+                self.fillVoids = False
+                # the target post spacing; if it isn't set, the one of the finest tile is used
+                self.size = None
+                # import every stride-th post in both directions
+                self.stride = 1
+                # if set, the stride is chosen to keep the number of vertices within vertexBudget
+                self.vertexBudget = 0
+                # "sample" takes every stride-th post, "average" averages the blocks of stride x stride posts
+                self.decimationMethod = "sample"
+                # the maximum vertical error in meters for the primitive type "rtin"
+                self.maxError = 1
+                # an instance of terrain_cache.TerrainCache for the built meshes
+                self.cache = None
+                # an instance of tile_index.TileIndex; the tiles not found there are looked for in srtmDir
+                self.tileIndex = None
+                # an instance of footprint.Footprint limiting the imported terrain
+                self.footprint = None
+                # the segments of a centerline and a schedule for footprint.getGradedSpacing(..);
+                # if set, the mesh is triangulated with the density graded with the distance from the centerline
+                self.centerline = None
+                self.gradingSchedule = None
+                # the voids of the whole decimated raster filled by getFilledVoids()
+                self.filledVoids = None
+
+                for key in kwargs:
+                        setattr(self, key, kwargs[key])
+
+                # we are going from top to down, that's why we call reversed()
+                self.latIntervals = list(reversed(getSrtmIntervals(self.minLat, self.maxLat)))
+                self.lonIntervals = getSrtmIntervals(self.minLon, self.maxLon)
+
+        def getTiles(self):
+                """
+                Returns the list of tuples (tile latitude, tile longitude) for all tiles of the extent
+                """
+                return [
+                        (math.floor(latInterval[0]), math.floor(lonInterval[0]))
+                        for latInterval in self.latIntervals for lonInterval in self.lonIntervals
+                ]
+
+        def detectSize(self):
+                """
+                Sets self.size to the size of the finest tile of the extent if it isn't set yet
+                Raises ValueError if a tile isn't a valid .hgt file
+                """
+                if not self.size:
+                        self.size = max(self.getTileSize(_lat, _lon) for (_lat, _lon) in self.getTiles())
+
+        def getLatWindows(self):
+                """
+                Returns the list of tuples (tile latitude, y1, y2) going from the north to the south
+                y1 and y2 are the vertical indices that limit the active area of the tile
+                The top row of a tile is shared with the bottom row of the tile above it,
+                so it is included only for the first (the northernmost) tile
+                """
+                windows = []
+                for i,latInterval in enumerate(self.latIntervals):
+                        # latitude of the lower-left corner of the SRTM tile
+                        _lat = math.floor(latInterval[0])
+                        y1 = math.floor( self.size * (latInterval[0] - _lat) )
+                        y2 = math.ceil( self.size * (latInterval[1] - _lat) )
+                        if i:
+                                y2 -= 1
+                        windows.append((_lat, y1, y2))
+                return windows
+
+        def getLonWindows(self):
+                """
+                Returns the list of tuples (tile longitude, x1, x2) going from the west to the east
+                x1 and x2 are the horizontal indices that limit the active area of the tile
+                The left column of a tile is shared with the right column of the tile to the left of it,
+                so it is included only for the first (the westernmost) tile
+                """
+                windows = []
+                for i,lonInterval in enumerate(self.lonIntervals):
+                        # longitude of the lower-left corner of the SRTM tile
+                        _lon = math.floor(lonInterval[0])
+                        x1 = math.floor( self.size * (lonInterval[0] - _lon) )
+                        if i:
+                                x1 += 1
+                        x2 = math.ceil( self.size * (lonInterval[1] - _lon) )
+                        windows.append((_lon, x1, x2))
+                return windows
+
+        def getRasterShape(self):
+                """
+                Returns the number of rows and columns of the stitched raster at the native resolution
+                """
+                return (
+                        sum(y2-y1+1 for (_lat, y1, y2) in self.getLatWindows()),
+                        sum(x2-x1+1 for (_lon, x1, x2) in self.getLonWindows())
+                )
+
+        def getStride(self):
+                if self.vertexBudget:
+                        (numRows, numCols) = self.getRasterShape()
+                        return getBudgetStride(numRows, numCols, self.vertexBudget)
+                return self.stride
+
+        def getDecimatedShape(self):
+                """
+                Returns the number of rows and columns of the raster decimated with self.getStride()
+                """
+                stride = self.getStride()
+                (numRows, numCols) = self.getRasterShape()
+                return (-(-numRows//stride), -(-numCols//stride))
+
+        def readRaster(self, stride=1, voidSubstitution=None, rows=None, cols=None):
+                """
+                Reads the active areas of all tiles and stitches them into a single raster
+                Only every stride-th row and column of the stitched raster is read and decoded
+                voidSubstitution overrides self.voidSubstitution
+                rows and cols are tuples (first, last+1) limiting the returned part of the sampled raster
+                Returns the tuple (lats, lons, heights)
+                lats is an array of the latitudes of the raster rows going from the north to the south
+                lons is an array of the longitudes of the raster columns going from the west to the east
+                heights is an array with the shape (len(lats), len(lons))
+                """
+                if voidSubstitution is None:
+                        voidSubstitution = self.voidSubstitution
+                latWindows = self.getLatWindows()
+                lonWindows = self.getLonWindows()
+                lats = np.concatenate([_lat + np.arange(y2, y1-1, -1)/self.size for (_lat, y1, y2) in latWindows])[::stride]
+                lons = np.concatenate([_lon + np.arange(x1, x2+1)/self.size for (_lon, x1, x2) in lonWindows])[::stride]
+                (r1, r2) = rows if rows else (0, len(lats))
+                (c1, c2) = cols if cols else (0, len(lons))
+                lats = lats[r1:r2]
+                lons = lons[c1:c2]
+
+                heights = np.empty((len(lats), len(lons)), dtype=np.int16)
+                # each tile window goes to its own place in the raster, so the tiles can be read in any order
+                windows = []
+                row = 0
+                for (_lat, y1, y2) in latWindows:
+                        # the rows of the sampled raster that fall within the tile window and the requested rows
+                        rowFrom = max(-(-row//stride), r1)
+                        rowTo = min(-(-(row+y2-y1+1)//stride), r2)
+                        col = 0
+                        for (_lon, x1, x2) in lonWindows:
+                                colFrom = max(-(-col//stride), c1)
+                                colTo = min(-(-(col+x2-x1+1)//stride), c2)
+                                if rowFrom < rowTo and colFrom < colTo:
+                                        windows.append((_lat, _lon, y1, y2, x1, x2, row, col, rowFrom, rowTo, colFrom, colTo))
+                                col += x2-x1+1
+                        row += y2-y1+1
+
+                def readTileWindow(window):
+                        (_lat, _lon, y1, y2, x1, x2, row, col, rowFrom, rowTo, colFrom, colTo) = window
+                        # row and col are the position of the tile window in the stitched raster at the target resolution
+                        rowSlice = slice(rowFrom*stride-row, (rowTo-1)*stride-row+1, stride)
+                        colSlice = slice(colFrom*stride-col, (colTo-1)*stride-col+1, stride)
+                        srtmFileName = self.getSrtmFileName(_lat, _lon)
+                        tileSize = self.getTileSize(_lat, _lon)
+                        if tileSize == self.size:
+                                heights[rowFrom-r1:rowTo-r1, colFrom-c1:colTo-c1] = decodeWindow(
+                                        readWindow(srtmFileName, self.size, y1, y2, x1, x2)[rowSlice, colSlice],
+                                        self.voidValue,
+                                        voidSubstitution
+                                )
+                        else:
+                                # the posts of the window at the target resolution, the rows go from the north to the south
+                                ys = np.arange(y2, y1-1, -1)[rowSlice]
+                                xs = np.arange(x1, x2+1)[colSlice]
+                                heights[rowFrom-r1:rowTo-r1, colFrom-c1:colTo-c1] = np.rint(resampleWindow(
+                                        srtmFileName, tileSize, ys, xs, self.size, self.voidValue, voidSubstitution
+                                ))
+
+                if len(windows) > 1:
+                        # file reading and the bulk decoding release the GIL, so the tiles are read concurrently
+                        with ThreadPoolExecutor(max_workers=min(len(windows), self.maxReadThreads)) as executor:
+                                # list(..) waits for all tiles and re-raises an exception of any worker
+                                list(executor.map(readTileWindow, windows))
+                elif windows:
+                        readTileWindow(windows[0])
+                return (lats, lons, heights)
+
+        def readDecimatedRaster(self, rows=None, cols=None):
+                """
+                Returns the tuple (lats, lons, heights, void) like readRaster(..), decimated according to
+                self.stride or self.vertexBudget and self.decimationMethod
+                void is a boolean array marking the void posts; they are filled by fillVoids(..)
+                if self.fillVoids is set or get self.voidSubstitution otherwise
+                rows and cols are tuples (first, last+1) limiting the returned part of the decimated raster
+                The voids of a part are filled with the heights of the whole raster filled at once (see getFilledVoids()),
+                so the parts get exactly the heights of the whole raster and their common borders match
+                """
+                (numRows, numCols) = self.getDecimatedShape()
+                (r1, r2) = rows if rows else (0, numRows)
+                (c1, c2) = cols if cols else (0, numCols)
+                (lats, lons, heights) = self.readDecimatedHeights(rows, cols)
+                void = heights==self.voidValue
+                if not self.fillVoids:
+                        heights[void] = self.voidSubstitution
+                elif (r1, r2, c1, c2) == (0, numRows, 0, numCols):
+                        heights = fillVoids(heights, void)
+                elif void.any():
+                        (indices, values) = self.getFilledVoids()
+                        (voidRows, voidCols) = np.nonzero(void)
+                        heights = heights.astype(np.float32)
+                        heights[void] = values[np.searchsorted(indices, (voidRows+r1)*numCols + voidCols+c1)]
+                return (lats, lons, heights, void)
+
+        def getFilledVoids(self):
+                """
+                Returns the tuple (indices, values): indices is the sorted array of the flat indices of the void posts
+                of the whole decimated raster, values is the array of their heights filled by fillVoids(..)
+                The whole raster is decoded and filled once, only the filled voids are kept
+                """
+                if self.filledVoids is None:
+                        heights = self.readDecimatedHeights()[2]
+                        void = heights==self.voidValue
+                        indices = np.flatnonzero(void)
+                        self.filledVoids = (indices, fillVoids(heights, void).reshape(-1)[indices])
+                return self.filledVoids
+
+        def readDecimatedHeights(self, rows=None, cols=None):
+                """
+                Returns the tuple (lats, lons, heights) of the decimated raster with the voids set to self.voidValue,
+                see readDecimatedRaster(..)
+                """
+                stride = self.getStride()
+                if stride == 1 or self.decimationMethod == "sample":
+                        return self.readRaster(stride, self.voidValue, rows, cols)
+                # average the blocks of stride x stride posts excluding the voids
+                if rows:
+                        rows = (rows[0]*stride, rows[1]*stride)
+                if cols:
+                        cols = (cols[0]*stride, cols[1]*stride)
+                (lats, lons, heights) = self.readRaster(voidSubstitution=self.voidValue, rows=rows, cols=cols)
+                return (blockAverage(lats, stride), blockAverage(lons, stride), blockAverage(heights, stride, self.voidValue))
+
+        def build(self):
+                """
+                Returns the tuple (verts, indices, filled, stats)
+                verts is an array of vertices with the shape (n, 3) stored row by row from the north to the south
+                indices is an array of faces: quads or triangles depending on self.primitiveType;
+                for the primitive type "rtin" only the posts used by the adaptive triangulation are in verts
+                filled is an array of the indices of the vertices at the void posts filled by interpolation
+                stats is a dictionary with the height statistics of the raster, see raster_ops.getHeightStats(..)
+                """
+                return self.buildCached()
+
+        def buildChunks(self, chunkSize):
+                """
+                A generator walking the extent in chunks of chunkSize x chunkSize posts of the decimated raster
+                Yields the tuple (chunk row, chunk column, verts, indices, filled, stats) for each chunk, see build()
+                Neighboring chunks share their border rows and columns, so there are no cracks between them
+                Only the tile windows of the current chunk are decoded, so the memory is bounded by the chunk size,
+                except with self.fillVoids: then the whole raster is decoded and filled once before the first chunk
+                (see readDecimatedRaster(..)), its peak memory is the one of build()
+                The chunks without any face within self.footprint are skipped
+                """
+                (numRows, numCols) = self.getDecimatedShape()
+                for (i, row) in enumerate(range(0, max(numRows-1, 1), chunkSize)):
+                        for (j, col) in enumerate(range(0, max(numCols-1, 1), chunkSize)):
+                                chunk = self.buildCached(
+                                        rows=(row, min(row+chunkSize+1, numRows)),
+                                        cols=(col, min(col+chunkSize+1, numCols)),
+                                        keepBorder=True
+                                )
+                                if len(chunk[1]):
+                                        yield (i, j) + chunk
+                                # the buffers of the chunk are freed before the next one is decoded
+                                chunk = None
+
+        def buildCached(self, rows=None, cols=None, keepBorder=False):
+                """
+                Returns the tuple (verts, indices, filled, stats) for the part of the decimated raster limited by rows and cols,
+                see readDecimatedRaster(..) and buildRaster(..)
+                If self.cache is set, the result is loaded from the cache or stored there
+                """
+                if self.cache:
+                        key = self.getCacheKey(rows, cols, keepBorder)
+                        entry = self.cache.load(key)
+                        if entry:
+                                return (
+                                        entry["verts"],
+                                        entry["indices"],
+                                        entry["filled"],
+                                        dict((name, entry[name]) for name in heightStatsNames)
+                                )
+                (lats, lons, heights, void) = self.readDecimatedRaster(rows, cols)
+                stats = getHeightStats(heights, void)
+                (verts, indices, filled) = self.buildRaster(lats, lons, heights, keepBorder, void if self.fillVoids else None)
+                if self.cache:
+                        self.cache.store(key, verts=verts, indices=indices, filled=filled, heights=heights, **stats)
+                return (verts, indices, filled, stats)
+
+        def getCacheKey(self, rows, cols, keepBorder):
+                """
+                Returns the cache key for everything the mesh of the part of the raster depends on
+                """
+                latWindows = self.getLatWindows()
+                lonWindows = self.getLonWindows()
+                return self.cache.getKey(
+                        tiles = [getFileStamp(self.getSrtmFileName(_lat, _lon)) for (_lat, y1, y2) in latWindows for (_lon, x1, x2) in lonWindows],
+                        size = self.size,
+                        latWindows = latWindows,
+                        lonWindows = lonWindows,
+                        stride = self.getStride(),
+                        decimationMethod = self.decimationMethod,
+                        voidSubstitution = self.voidSubstitution,
+                        fillVoids = self.fillVoids,
+                        projection = (self.projection.lat, self.projection.lon, self.projection.k),
+                        primitiveType = self.primitiveType,
+                        maxError = self.maxError if self.primitiveType == "rtin" else None,
+                        rows = rows,
+                        cols = cols,
+                        keepBorder = keepBorder,
+                        footprint = self.footprint.getKey() if self.footprint else None,
+                        grading = (Footprint(self.centerline).getKey(), self.gradingSchedule) if self.isGraded() else None
+                )
+
+        def isGraded(self):
+                return self.centerline is not None and bool(self.gradingSchedule)
+
+        def buildRaster(self, lats, lons, heights, keepBorder=False, filled=None):
+                """
+                Returns the tuple (verts, indices, filled) for the raster, see build()
+                keepBorder makes the adaptive triangulation keep all posts at the border of the raster
+                filled is a boolean array marking the filled void posts of the raster
+                If self.footprint is set, only the faces with a vertex within the footprint are kept
+                If the mesh is graded (see isGraded()), it is triangulated by rtin.triangulate(..) for any primitive type;
+                the height error is taken into account only for the primitive type "rtin"
+                """
+                if filled is None:
+                        filled = np.zeros(heights.shape, dtype=bool)
+                (numRows, numCols) = heights.shape
+                graded = self.isGraded()
+                if self.primitiveType != "rtin" or self.footprint or graded:
+                        grid = self.projectRaster(lats, lons, heights)
+                if self.primitiveType == "rtin" or graded:
+                        (rows, cols, indices) = triangulate(
+                                heights,
+                                self.maxError if self.primitiveType == "rtin" else None,
+                                keepBorder,
+                                getGradedSpacing(grid[:,:,0], grid[:,:,1], self.centerline, self.gradingSchedule) if graded else None
+                        )
+                        if self.footprint or graded:
+                                verts = grid[rows, cols]
+                        else:
+                                verts = np.empty((len(rows), 3), dtype=np.float32)
+                                (verts[:,0], verts[:,1]) = self.projection.fromGeographicArray(lats[rows], lons[cols])
+                                verts[:,2] = heights[rows, cols]
+                        posts = rows*numCols + cols
+                else:
+                        verts = grid.reshape(-1, 3)
+                        indices = gridFaces(numRows, numCols, self.primitiveType)
+                        posts = None
+                filled = filled.reshape(-1) if posts is None else filled.reshape(-1)[posts]
+
+                if self.footprint:
+                        mask = self.footprint.getMask(grid[:,:,0], grid[:,:,1]).reshape(-1)
+                        if posts is not None:
+                                mask = mask[posts]
+                        indices = indices[mask[indices].any(axis=1)]
+                        (verts, indices, index) = removeUnusedVertices(verts, indices)
+                        filled = filled[index>=0]
+                return (verts, indices, np.flatnonzero(filled).astype(np.int32))
+
+        def projectRaster(self, lats, lons, heights):
+                """
+                Returns the array of the projected posts of the raster with the shape (len(lats), len(lons), 3)
+                """
+                verts = np.empty((len(lats), len(lons), 3), dtype=np.float32)
+                # project the raster by blocks of rows to limit the size of the temporary arrays
+                for row in range(0, len(lats), self.projectionBlockSize):
+                        rows = slice(row, row+self.projectionBlockSize)
+                        (verts[rows,:,0], verts[rows,:,1]) = self.projection.fromGeographicArray(lats[rows,None], lons)
+                verts[:,:,2] = heights
+                return verts
+
+        def getSrtmFileName(self, lat, lon):
+                """
+                Returns the path of the tile file: a .hgt file or a compressed .hgt.zip or .hgt.gz one
+                If there is no such file, the path of the .hgt file in self.srtmDir is returned
+                """
+                tile = self.tileIndex and self.tileIndex.getTile(lat, lon)
+                if tile:
+                        return tile[0]
+                fileName = os.path.join(self.srtmDir, getTileName(lat, lon) + ".hgt")
+                return findTile(fileName) or fileName
+
+        def getTileSize(self, lat, lon):
+                """
+                Returns the native size of the tile, see hgt_tiles.getTileSize(..)
+                """
+                tile = self.tileIndex and self.tileIndex.getTile(lat, lon)
+                return tile[1] if tile else getTileSize(self.getSrtmFileName(lat, lon))
+
+        def hasTile(self, lat, lon):
+                tile = self.tileIndex and self.tileIndex.getTile(lat, lon)
+                return True if tile else os.path.exists(self.getSrtmFileName(lat, lon))
+
+        def getMissingSrtmFiles(self):
+                """
+                Returns None if all required SRTM files are found
+                Returns the list of missing SRTM file otherwise
+                """
+                missingFiles = []
+                for (_lat, _lon) in self.getTiles():
+                        # check if the SRTM file exists
+                        if not self.hasTile(_lat, _lon):
+                                missingFiles.append(self.getSrtmFileName(_lat, _lon))
+                return missingFiles if len(missingFiles)>0 else None
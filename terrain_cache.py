@@ -0,0 +1,96 @@
+"""
+Persistent on-disk cache of decoded and projected terrain
+
+An entry is a set of named NumPy arrays stored in a single .npz file.
+The name of the file is a hash of the parameters the arrays were built from, so an entry is never
+modified: if a source file changes, its size or mtime become part of a different key.
+The entries that weren't used for the longest time are removed when the total size
+of the cache exceeds the limit.
+"""
+
+import os, tempfile, hashlib
+import numpy as np
+
+defaultCacheDir = os.path.join(tempfile.gettempdir(), "blender_terrain_cache")
+
+
+def getFileStamp(filepath):
+        """
+        Returns the tuple (absolute path, size, mtime) identifying the current state of the file
+        """
+        filepath = os.path.abspath(filepath)
+        stat = os.stat(filepath)
+        return (filepath, stat.st_size, stat.st_mtime)
+
+
+class TerrainCache:
+
+        # the version of the layout of the entries, it is a part of each key
+        version = 2
+
+        def __init__(self, cacheDir=None, maxSize=2048*1024*1024):
+                """
+                cacheDir is the directory for the cache entries, maxSize is the size limit in bytes
+                """
+                self.cacheDir = cacheDir or defaultCacheDir
+                self.maxSize = maxSize
+
+        def getKey(self, **params):
+                """
+                Returns the key for the parameters; they must have a stable repr(..)
+                """
+                return hashlib.sha1( repr((self.version, sorted(params.items()))).encode("utf-8") ).hexdigest()
+
+        def getPath(self, key):
+                return os.path.join(self.cacheDir, key + ".npz")
+
+        def load(self, key):
+                """
+                Returns the dictionary of the arrays stored for the key or None if there is no such entry
+                """
+                path = self.getPath(key)
+                try:
+                        with np.load(path) as entry:
+                                arrays = dict((name, entry[name]) for name in entry.files)
+                except (IOError, OSError, ValueError):
+                        return None
+                # the mtime of an entry is its last use
+                os.utime(path, None)
+                return arrays
+
+        def store(self, key, **arrays):
+                """
+                Stores the arrays for the key and removes the least recently used entries if needed
+                """
+                if not os.path.isdir(self.cacheDir):
+                        os.makedirs(self.cacheDir)
+                # write to a temporary file first, so no other process sees a partially written entry
+                (fd, tmpPath) = tempfile.mkstemp(dir=self.cacheDir, suffix=".tmp")
+                try:
+                        with os.fdopen(fd, "wb") as f:
+                                np.savez(f, **arrays)
+                        os.replace(tmpPath, self.getPath(key))
+                except:
+                        os.remove(tmpPath)
+                        raise
+                self.evict()
+
+        def evict(self):
+                """
+                Removes the least recently used entries until the total size fits into self.maxSize
+                """
+                entries = []
+                for fileName in os.listdir(self.cacheDir):
+                        if fileName.endswith(".npz"):
+                                path = os.path.join(self.cacheDir, fileName)
+                                stat = os.stat(path)
+                                entries.append((stat.st_mtime, stat.st_size, path))
+                totalSize = sum(entry[1] for entry in entries)
+                for (mtime, size, path) in sorted(entries):
+                        if totalSize <= self.maxSize:
+                                break
+                        try:
+                                os.remove(path)
+                        except OSError:
+                                pass
+                        totalSize -= size
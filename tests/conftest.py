@@ -0,0 +1,4 @@
+import sys, os
+
+# the modules of the repository aren't installed, they are imported from its root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,49 @@
+import json
+import numpy as np
+import pytest
+
+from batch_import import buildJob, main
+from pt_array import writeTextHeightGrid
+
+
+def writeGrid(path, nx=50, ny=40):
+        heights = np.add.outer(np.arange(ny), np.arange(nx)).astype(np.float32)
+        writeTextHeightGrid(str(path), (nx, ny, 0.0001, 0.0001, 5., 50.), heights)
+        return str(path)
+
+
+def test_stride_decimates_grid_job(tmp_path):
+        job = dict(source="grid", file=writeGrid(tmp_path / "t.grid"), output="t.npz")
+        assert len(buildJob(job)["verts"]) == 2000
+        job["stride"] = 4
+        assert len(buildJob(job)["verts"]) == 13*10
+
+
+def test_vertex_budget_and_average_of_grid_job(tmp_path):
+        job = dict(source="grid", file=writeGrid(tmp_path / "t.grid"), output="t.npz",
+                vertexBudget=500, decimationMethod="average")
+        arrays = buildJob(job)
+        assert len(arrays["verts"]) <= 500
+        # the blocks of the linear surface keep its mean height
+        assert abs(arrays["meanHeight"] - 44.) < 1.
+
+
+def test_srtm_only_key_of_grid_job(tmp_path):
+        job = dict(source="grid", file=writeGrid(tmp_path / "t.grid"), output="t.npz", voidSubstitution=5)
+        with pytest.raises(ValueError):
+                buildJob(job)
+
+
+def test_invalid_jobs_fail_before_the_run(tmp_path, capsys):
+        writeGrid(tmp_path / "t.grid")
+        jobs = dict(jobs=[
+                dict(source="grid", file="t.grid", output="t.npz"),
+                dict(source="grid", file="t.grid", output="t.blend"),
+                dict(source="grid", file="t.grid", output="v.npz", voidSubstitution=5)
+        ])
+        jobFile = tmp_path / "jobs.json"
+        jobFile.write_text(json.dumps(jobs))
+        assert main([str(jobFile), "--processes", "1"]) == 2
+        out = capsys.readouterr().out
+        assert "FAILED t: The .blend output needs Blender" in out and "FAILED v:" in out
+        assert (tmp_path / "t.npz").exists()
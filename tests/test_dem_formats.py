@@ -0,0 +1,40 @@
+import numpy as np
+
+from dem_formats import openEsriAscii
+from pt_array import PtArray
+from transverse_mercator import PlanarProjection
+
+
+def writeAsc(path, heights, nodata=None):
+        (ny, nx) = heights.shape
+        with open(path, "w") as f:
+                f.write("ncols %d\nnrows %d\nxllcorner 500000\nyllcorner 4000000\ncellsize 1\n" % (nx, ny))
+                if nodata is not None:
+                        f.write("NODATA_value %s\n" % nodata)
+                np.savetxt(f, heights, fmt="%g")
+        return path
+
+
+def test_esri_ascii_default_nodata(tmp_path):
+        heights = np.arange(20.).reshape(4, 5)
+        heights[1, 2] = -9999
+        (f, header, layout) = openEsriAscii(writeAsc(str(tmp_path / "t.asc"), heights))
+        with f:
+                assert layout["void"] == -9999
+                assert not layout["geographic"]
+                (nx, ny, incx, incy, minx, miny) = header
+                (verts, indices, stats) = PtArray(
+                        nx=nx, ny=ny, incx=incx, incy=incy, minlon=minx, minlat=miny, f=f, layout=layout,
+                        projection=PlanarProjection(x=minx, y=miny), primitiveType="quad"
+                ).build()
+        assert stats["voidCount"] == 1
+        assert stats["minHeight"] == 0
+        # the faces touching the void are left out
+        assert len(indices) == 4*3 - 4
+
+
+def test_esri_ascii_explicit_nodata(tmp_path):
+        (f, header, layout) = openEsriAscii(writeAsc(str(tmp_path / "t.asc"), np.zeros((2, 3)), nodata=-32768))
+        f.close()
+        assert layout["void"] == -32768
+        assert header[:2] == (3, 2)
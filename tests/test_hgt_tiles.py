@@ -0,0 +1,56 @@
+import os, gzip, zipfile
+import numpy as np
+
+import hgt_tiles
+from hgt_tiles import CompressedHgtTile, getTile, readWindow, releaseTiles
+
+
+def writeTile(path, size=120, value=0):
+        heights = (np.arange((size+1)*(size+1)).reshape(size+1, size+1) % 1000 + value).astype(">i2")
+        if path.endswith(".gz"):
+                with gzip.open(path, "wb") as f:
+                        f.write(heights.tobytes())
+        else:
+                heights.tofile(path)
+        return path
+
+
+def test_tile_cache_is_bounded(tmp_path, monkeypatch):
+        tileBytes = 2*121*121
+        monkeypatch.setattr(hgt_tiles, "tileCacheBytes", 3*tileBytes)
+        releaseTiles()
+        try:
+                paths = [writeTile(str(tmp_path / ("N%02dE005.hgt.gz" % i)), value=i) for i in range(4)] + \
+                        [writeTile(str(tmp_path / "N10E005.hgt"))]
+                tiles = [getTile(path, 120) for path in paths[:3]]
+                # a tile used again becomes the most recently used one
+                assert getTile(paths[0], 120) is tiles[0]
+                getTile(paths[3], 120)
+                assert list(hgt_tiles._tiles) == [os.path.abspath(path) for path in (paths[2], paths[0], paths[3])]
+                getTile(paths[4], 120)
+                assert len(hgt_tiles._tiles) == 3
+                assert sum(entry[2].getBytes() for entry in hgt_tiles._tiles.values()) <= 3*tileBytes
+                # a released tile is opened again
+                assert readWindow(paths[1], 120, 0, 0, 0, 2)[0, 0] == (120*121) % 1000 + 1
+                assert os.path.abspath(paths[1]) in hgt_tiles._tiles
+        finally:
+                releaseTiles()
+
+
+def test_closed_tile_resumes_decompression(tmp_path):
+        for name in ("N00E005.hgt.gz", "N00E006.hgt.zip"):
+                path = str(tmp_path / name)
+                if name.endswith(".zip"):
+                        hgtPath = writeTile(str(tmp_path / "N00E006.hgt"), value=7)
+                        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+                                archive.write(hgtPath, "N00E006.hgt")
+                        expected = np.fromfile(hgtPath, dtype=">i2").reshape(121, 121)
+                else:
+                        writeTile(path, value=3)
+                        with gzip.open(path) as f:
+                                expected = np.frombuffer(f.read(), dtype=">i2").reshape(121, 121)
+                tile = CompressedHgtTile(path, 120)
+                assert np.array_equal(tile.getSamples(10)[:10], expected[:10])
+                # e.g. the tile is released from the cache while a caller still holds it
+                tile.close()
+                assert np.array_equal(tile.getSamples(121), expected)
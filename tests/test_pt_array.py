@@ -0,0 +1,63 @@
+import numpy as np
+
+from pt_array import PtArray, openGrid, convertGrid, writeTextHeightGrid
+from transverse_mercator import TransverseMercator, PlanarProjection
+
+
+def writeColumnMajorGrid(path, nx=6, ny=4, inc=0.0001, minLon=-121.7585, minLat=36.579):
+        """
+        Writes a text .grid file with one column of posts (a path along the latitude) after another like mkgrid.sh
+        Returns the heights with the shape (ny, nx)
+        """
+        heights = 100. + np.arange(ny)[:,None] + 10.*np.arange(nx)
+        with open(path, "w") as f:
+                f.write("%d %d %r %r %r %r\n" % (nx, ny, inc, inc, minLon, minLat))
+                for col in range(nx):
+                        for row in range(ny):
+                                f.write("%.7f %.7f %.3f\n" % (minLat + row*inc, minLon + col*inc, heights[row, col]))
+        return heights
+
+
+def buildGrid(path):
+        (f, (nx, ny, incx, incy, minlon, minlat), layout) = openGrid(path)
+        with f:
+                return PtArray(
+                        nx=nx, ny=ny, incx=incx, incy=incy, minlon=minlon, minlat=minlat, f=f, layout=layout,
+                        projection=TransverseMercator(lat=minlat, lon=minlon), primitiveType="quad"
+                ).build()
+
+
+def test_convert_column_major_grid(tmp_path):
+        textPath = str(tmp_path / "t.grid")
+        heights = writeColumnMajorGrid(textPath)
+        for (name, heightsOnly) in (("h.grid", True), ("b.grid", False)):
+                outputPath = str(tmp_path / name)
+                convertGrid(textPath, outputPath, heightsOnly)
+                (f, header, layout) = openGrid(outputPath)
+                f.close()
+                # the header geometry is enough, the latitudes and the longitudes aren't stored
+                assert layout["arrays"] == ("heights",)
+                verts = buildGrid(outputPath)[0]
+                assert np.allclose(verts[:,2], heights.reshape(-1))
+                # the longitude changes first
+                assert verts[1,0] > verts[0,0] and abs(verts[1,1] - verts[0,1]) < 0.01
+
+
+def test_downsampled_linear_surface(tmp_path):
+        # the geographic lattice of the grid is exact in the planar projection, so the heights of a linear function
+        # of x and y must be reproduced at every post including the border ones
+        (nx, ny) = (103, 77)
+        (rows, cols) = np.mgrid[0:ny, 0:nx]
+        heights = 0.5*cols - 0.3*rows + 100.
+        path = str(tmp_path / "l.grid")
+        writeTextHeightGrid(path, (nx, ny, 1., 1., 0., 0.), heights)
+        for method in ("bilinear", "bicubic"):
+                (f, (nx, ny, incx, incy, minlon, minlat), layout) = openGrid(path)
+                with f:
+                        verts = PtArray(
+                                nx=nx, ny=ny, incx=incx, incy=incy, minlon=minlon, minlat=minlat, f=f, layout=layout,
+                                projection=PlanarProjection(), primitiveType="quad",
+                                resampleSpacing=5., resampleMethod=method
+                        ).build()[0]
+                assert verts[:,0].min() == 0. and verts[:,0].max() == 100. and verts[:,1].max() == 75.
+                assert np.allclose(verts[:,2], 0.5*verts[:,0] - 0.3*verts[:,1] + 100., rtol=0, atol=1e-4)
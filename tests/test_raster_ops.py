@@ -0,0 +1,23 @@
+import numpy as np
+
+from raster_ops import resample
+
+
+def test_resample_accuracy():
+        (rows, cols) = np.mgrid[0:12, 0:15].astype(np.float64)
+        # the fractional indices cover the whole array including the cells at its border
+        ys = np.linspace(0., 11., 67)[:,None]
+        xs = np.linspace(0., 14., 71)
+        linear = 3.*rows - 2.*cols + 5.
+        for method in ("bilinear", "bicubic"):
+                assert np.allclose(resample(linear, ys, xs, method), 3.*ys - 2.*xs + 5.)
+
+        def surface(y, x):
+                return np.sin(y/2.) * np.cos(x/3.)
+        values = surface(rows, cols)
+        truth = surface(ys, xs)
+        errors = dict((method, np.abs(resample(values, ys, xs, method) - truth)) for method in ("bilinear", "bicubic"))
+        border = (ys < 1) | (ys > 10) | (xs < 1) | (xs > 13)
+        # the bicubic interpolation is more accurate inside and not less accurate at the border
+        assert errors["bicubic"][~border].max() < 0.5*errors["bilinear"][~border].max()
+        assert np.all(errors["bicubic"][border] <= errors["bilinear"][border] + 1e-12)
@@ -0,0 +1,71 @@
+import os, weakref
+import numpy as np
+
+from srtm import Srtm
+from transverse_mercator import TransverseMercator
+from tile_index import getTileName
+
+
+def writeTile(directory, lat, lon, size=1200):
+        # the rows go from the north to the south
+        (y, x) = np.mgrid[size:-1:-1, 0:size+1]
+        heights = (500. + 80.*np.sin(y/37.) + 60.*np.cos(x/23.)).astype(">i2")
+        # a void much wider than a chunk and a few small ones
+        heights[300:460, 250:420] = -32768
+        heights[100:103, 100:130] = -32768
+        heights[520, 480:500] = -32768
+        heights.tofile(os.path.join(directory, getTileName(lat, lon) + ".hgt"))
+
+
+def getSrtm(directory, **kwargs):
+        srtm = Srtm(
+                minLat=50.55, maxLat=50.7, minLon=5.15, maxLon=5.4,
+                projection=TransverseMercator(lat=50.6, lon=5.3),
+                srtmDir=directory, primitiveType="quad", fillVoids=True, **kwargs
+        )
+        srtm.detectSize()
+        return srtm
+
+
+def test_chunks_match_whole_with_filled_voids(tmp_path):
+        writeTile(str(tmp_path), 50, 5)
+        srtm = getSrtm(str(tmp_path))
+        (numRows, numCols) = srtm.getDecimatedShape()
+        (verts, indices, filled, stats) = srtm.build()
+        # the big void within the extent is wider than the chunks
+        assert stats["voidCount"] > 100*160
+        whole = verts.reshape(numRows, numCols, 3)
+        chunkSize = 37
+        for (i, j, chunkVerts, chunkIndices, chunkFilled, chunkStats) in getSrtm(str(tmp_path)).buildChunks(chunkSize):
+                (row, col) = (i*chunkSize, j*chunkSize)
+                part = whole[row:min(row+chunkSize+1, numRows), col:min(col+chunkSize+1, numCols)]
+                assert np.array_equal(chunkVerts.reshape(part.shape), part)
+
+
+def test_chunks_match_whole_with_averaged_voids(tmp_path):
+        writeTile(str(tmp_path), 50, 5)
+        (numRows, numCols) = getSrtm(str(tmp_path), stride=3, decimationMethod="average").getDecimatedShape()
+        whole = getSrtm(str(tmp_path), stride=3, decimationMethod="average").build()[0].reshape(numRows, numCols, 3)
+        chunkSize = 16
+        for chunk in getSrtm(str(tmp_path), stride=3, decimationMethod="average").buildChunks(chunkSize):
+                (row, col) = (chunk[0]*chunkSize, chunk[1]*chunkSize)
+                part = whole[row:min(row+chunkSize+1, numRows), col:min(col+chunkSize+1, numCols)]
+                assert np.array_equal(chunk[2].reshape(part.shape), part)
+
+
+def test_chunk_buffers_are_freed(tmp_path, monkeypatch):
+        writeTile(str(tmp_path), 50, 5)
+        srtm = getSrtm(str(tmp_path))
+        buildCached = srtm.buildCached
+        previous = []
+        def checkedBuildCached(*args, **kwargs):
+                # the buffers of the previous chunk aren't referenced anymore when the next one is decoded
+                assert all(ref() is None for ref in previous)
+                return buildCached(*args, **kwargs)
+        monkeypatch.setattr(srtm, "buildCached", checkedBuildCached)
+        numChunks = 0
+        for chunk in srtm.buildChunks(64):
+                previous = [weakref.ref(array) for array in chunk[2:5]]
+                numChunks += 1
+                chunk = None
+        assert numChunks > 1
@@ -0,0 +1,137 @@
+"""
+Index of the SRTM tiles available in one or more tile directories
+
+The directories are walked once; every tile file found (.hgt, .hgt.zip or .hgt.gz, see hgt_tiles.hgtExtensions)
+is recorded with its resolution. The result is kept in a small JSON manifest, so the next index update
+only lists the directories whose mtime has changed since the last scan. Adding or removing a tile file
+changes the mtime of its directory; a tile file replaced in place isn't noticed.
+Resolving the tiles of an extent is a dictionary lookup after that.
+"""
+
+import os, re, json, tempfile, hashlib
+
+from hgt_tiles import getTileSize
+from terrain_cache import defaultCacheDir
+
+# e.g. N36W121.hgt, n36w121.hgt.zip, N36W121.SRTMGL1.hgt.zip
+tileFileName = re.compile(r"^([NS])(\d{2})([EW])(\d{3})(\.[^.]+)*?\.hgt(\.zip|\.gz)?$", re.IGNORECASE)
+
+
+def getTileName(lat, lon):
+        """
+        Returns the name of the tile with the lower-left corner at lat, lon, e.g. N36W121
+        """
+        return "{}{:02d}{}{:03d}".format("N" if lat>=0 else "S", abs(lat), "E" if lon>=0 else "W", abs(lon))
+
+
+class TileIndex:
+
+        # the version of the manifest layout
+        version = 1
+
+        def __init__(self, roots, manifestPath=None):
+                """
+                roots is a list of the tile directories, they are searched with their subdirectories
+                manifestPath is the path of the JSON manifest; by default it is placed into terrain_cache.defaultCacheDir
+                """
+                self.roots = [os.path.abspath(root) for root in roots]
+                if not manifestPath:
+                        key = hashlib.sha1( repr(self.roots).encode("utf-8") ).hexdigest()
+                        manifestPath = os.path.join(defaultCacheDir, "tile_index_%s.json" % key)
+                self.manifestPath = manifestPath
+                # the key is the tile name (see getTileName(..)), the value is a tuple (path, size)
+                self.tiles = {}
+                self.update()
+
+        def update(self):
+                """
+                Brings the index up to date with the tile directories and saves the manifest if anything has changed
+                """
+                dirs = self.loadManifest()
+                scanned = {}
+                changed = False
+                stack = list(reversed(self.roots))
+                while stack:
+                        path = stack.pop()
+                        if path in scanned:
+                                continue
+                        try:
+                                mtime = os.stat(path).st_mtime
+                        except OSError:
+                                changed = changed or path in dirs
+                                continue
+                        entry = dirs.get(path)
+                        if not entry or entry["mtime"] != mtime:
+                                entry = self.scanDir(path, mtime, entry["tiles"] if entry else {})
+                                changed = True
+                        scanned[path] = entry
+                        stack.extend(os.path.join(path, subdir) for subdir in reversed(entry["subdirs"]))
+                if changed or len(scanned) != len(dirs):
+                        self.saveManifest(scanned)
+
+                self.tiles = {}
+                for path in sorted(scanned):
+                        for (fileName, size) in sorted(scanned[path]["tiles"].items()):
+                                name = tileFileName.match(fileName)
+                                name = "".join(name.group(1, 2, 3, 4)).upper()
+                                # the finest resolution wins; for the same resolution the first file name in
+                                # the alphabetical order wins, i.e. a bare .hgt file goes before the compressed ones
+                                tile = self.tiles.get(name)
+                                if not tile or size > tile[1]:
+                                        self.tiles[name] = (os.path.join(path, fileName), size)
+
+        def scanDir(self, path, mtime, knownTiles):
+                """
+                Lists the directory; the resolution of the tiles known from the previous scan isn't detected again
+                Returns the manifest entry for the directory
+                """
+                subdirs = []
+                tiles = {}
+                for fileName in sorted(os.listdir(path)):
+                        filePath = os.path.join(path, fileName)
+                        if os.path.isdir(filePath):
+                                subdirs.append(fileName)
+                        elif tileFileName.match(fileName):
+                                size = knownTiles.get(fileName)
+                                if not size:
+                                        try:
+                                                size = getTileSize(filePath)
+                                        except ValueError:
+                                                # not a valid tile
+                                                continue
+                                tiles[fileName] = size
+                return {"mtime": mtime, "subdirs": subdirs, "tiles": tiles}
+
+        def loadManifest(self):
+                """
+                Returns the directory entries of the manifest or an empty dictionary
+                """
+                try:
+                        with open(self.manifestPath, "r") as f:
+                                manifest = json.load(f)
+                except (IOError, OSError, ValueError):
+                        return {}
+                if manifest.get("version") != self.version or manifest.get("roots") != self.roots:
+                        return {}
+                return manifest["dirs"]
+
+        def saveManifest(self, dirs):
+                manifestDir = os.path.dirname(self.manifestPath)
+                if not os.path.isdir(manifestDir):
+                        os.makedirs(manifestDir)
+                # write to a temporary file first, so no other process sees a partially written manifest
+                (fd, tmpPath) = tempfile.mkstemp(dir=manifestDir, suffix=".tmp")
+                try:
+                        with os.fdopen(fd, "w") as f:
+                                json.dump({"version": self.version, "roots": self.roots, "dirs": dirs}, f)
+                        os.replace(tmpPath, self.manifestPath)
+                except:
+                        os.remove(tmpPath)
+                        raise
+
+        def getTile(self, lat, lon):
+                """
+                Returns the tuple (path, size) for the tile with the lower-left corner at lat, lon
+                or None if the tile isn't available
+                """
+                return self.tiles.get(getTileName(lat, lon))
@@ -0,0 +1,95 @@
+import math
+import numpy as np
+
+# see conversion formulas at
+# http://en.wikipedia.org/wiki/Transverse_Mercator_projection
+# and
+# http://mathworld.wolfram.com/MercatorProjection.html
+class TransverseMercator:
+        radius = 6378137
+
+        def __init__(self, **kwargs):
+                # setting default values
+                self.lat = 0 # in degrees
+                self.lon = 0 # in degrees
+                self.k = 1 # scale factor
+                
+                for attr in kwargs:
+                        setattr(self, attr, kwargs[attr])
+                self.latInRadians = math.radians(self.lat)
+
+        def fromGeographic(self, lat, lon):
+                lat = math.radians(lat)
+                lon = math.radians(lon-self.lon)
+                B = math.sin(lon) * math.cos(lat)
+                x = 0.5 * self.k * self.radius * math.log((1+B)/(1-B))
+                y = self.k * self.radius * ( math.atan(math.tan(lat)/math.cos(lon)) - self.latInRadians )
+                return (x,y)
+
+        def toGeographic(self, x, y):
+                x = x/(self.k * self.radius)
+                y = y/(self.k * self.radius)
+                D = y + self.latInRadians
+                lon = math.atan(math.sinh(x)/math.cos(D))
+                lat = math.asin(math.sin(D)/math.cosh(x))
+
+                lon = self.lon + math.degrees(lon)
+                lat = math.degrees(lat)
+                return (lat, lon)
+
+        def fromGeographicArray(self, lat, lon):
+                """
+                The same as fromGeographic(..) for NumPy arrays of latitudes and longitudes
+                lat and lon are broadcast against each other, so a column of latitudes and
+                a row of longitudes give the projected coordinates of the whole grid
+                Returns the tuple (x, y) of float64 arrays
+                """
+                lat = np.radians(lat)
+                lon = np.radians(np.subtract(lon, self.lon))
+                B = np.sin(lon) * np.cos(lat)
+                x = 0.5 * self.k * self.radius * np.log((1+B)/(1-B))
+                y = self.k * self.radius * ( np.arctan(np.tan(lat)/np.cos(lon)) - self.latInRadians )
+                return (x,y)
+
+        def toGeographicArray(self, x, y):
+                """
+                The same as toGeographic(..) for NumPy arrays of x and y coordinates
+                Returns the tuple (lat, lon) of float64 arrays
+                """
+                x = np.divide(x, self.k * self.radius)
+                y = np.divide(y, self.k * self.radius)
+                D = y + self.latInRadians
+                lon = np.arctan(np.sinh(x)/np.cos(D))
+                lat = np.arcsin(np.sin(D)/np.cosh(x))
+
+                lon = self.lon + np.degrees(lon)
+                lat = np.degrees(lat)
+                return (lat, lon)
+
+
+class PlanarProjection:
+        """
+        The projection of the rasters with projected coordinates (e.g. UTM) in meters of an unknown coordinate system:
+        the coordinates are only shifted by the origin x, y; the "latitude" is the y coordinate
+        and the "longitude" is the x coordinate, so it has the interface of TransverseMercator
+        """
+
+        def __init__(self, **kwargs):
+                # setting default values
+                self.x = 0 # in meters
+                self.y = 0 # in meters
+                
+                for attr in kwargs:
+                        setattr(self, attr, kwargs[attr])
+
+        def fromGeographic(self, lat, lon):
+                return (lon-self.x, lat-self.y)
+
+        def toGeographic(self, x, y):
+                return (y+self.y, x+self.x)
+
+        def fromGeographicArray(self, lat, lon):
+                return (np.subtract(lon, self.x), np.subtract(lat, self.y))
+
+        def toGeographicArray(self, x, y):
+                return (np.add(y, self.y), np.add(x, self.x))